@@ -1,32 +1,79 @@
+from importlib import import_module
+
 from flask import Flask
 from flask_cors import CORS
 
-# Import all route blueprints
-from routes.stt_route import stt_bp
-from routes.translate_route import translate_bp
-from routes.tts_route import tts_bp
-from routes.score_route import score_bp
-from routes.phrases_route import phrases_bp
-from routes.log_route import log_bp
+from routes.health_route import health_bp
+
+from utils.config_utils import env_str, env_bool
+from utils.model_loader import preload_models
+
+# Route name -> (module, blueprint attribute)
+# Modules are imported only for enabled routes: importing one builds its
+# services (engines, caches, worker pools), so a worker that disables a
+# route never pays for it. Models are loaded lazily on top of that.
+ROUTES = {
+    "stt": ("routes.stt_route", "stt_bp"),
+    "translate": ("routes.translate_route", "translate_bp"),
+    "tts": ("routes.tts_route", "tts_bp"),
+    "score": ("routes.score_route", "score_bp"),
+    "phrases": ("routes.phrases_route", "phrases_bp"),
+    "log": ("routes.log_route", "log_bp"),
+}
+
+
+def route_models(name):
+    """Models an enabled route needs (called after its module is imported)."""
+    if name == "stt":
+        from services.stt_stream import STREAM_MODEL
+        return ["stt_workers", f"whisper-{STREAM_MODEL}"]
+    if name == "score":
+        from services.stt_service import DEFAULT_MODEL
+        return [f"whisper-{DEFAULT_MODEL}"]
+    if name == "translate":
+        return ["nllb"]
+    return []
 
 
-def create_app():
+def create_app(enabled_routes=None, preload=None):
     """
     Application factory for the Voice Translator backend.
-    Loads all blueprints and configures CORS.
+    Loads the enabled blueprints and configures CORS.
+
+    enabled_routes: names from ROUTES (default: BACKEND_ROUTES env var,
+                    comma separated, or every route)
+    preload:        load + warm up the needed models in the background right
+                    after startup instead of on first use
+                    (default: PRELOAD_MODELS env var)
     """
+    if enabled_routes is None:
+        configured = env_str("BACKEND_ROUTES", ",".join(ROUTES))
+        enabled_routes = [r.strip() for r in configured.split(",") if r.strip()]
+    if preload is None:
+        preload = env_bool("PRELOAD_MODELS", False)
+
+    unknown = [r for r in enabled_routes if r not in ROUTES]
+    if unknown:
+        raise ValueError(f"Unknown routes in BACKEND_ROUTES: {unknown}")
+
     app = Flask(__name__)
 
     # Enable CORS (allow calls from React frontend on port 3000)
     CORS(app, resources={r"*": {"origins": "*"}})
 
-    # Register all blueprints
-    app.register_blueprint(stt_bp)
-    app.register_blueprint(translate_bp)
-    app.register_blueprint(tts_bp)
-    app.register_blueprint(score_bp)
-    app.register_blueprint(phrases_bp)
-    app.register_blueprint(log_bp)
+    # Register the enabled blueprints (+ the readiness probe)
+    models = []
+    for name in enabled_routes:
+        module, attribute = ROUTES[name]
+        app.register_blueprint(getattr(import_module(module), attribute))
+        models += [m for m in route_models(name) if m not in models]
+
+    app.register_blueprint(health_bp)
+    app.config["MODELS"] = models
+    app.config["PRELOAD_MODELS"] = preload
+
+    if preload:
+        preload_models(models)
 
     @app.route("/")
     def home():
@@ -0,0 +1,35 @@
+from flask import Blueprint, current_app, jsonify
+from utils.model_loader import models_status, READY, FAILED
+
+health_bp = Blueprint("health", __name__)
+
+
+@health_bp.route("/ready", methods=["GET"])
+def ready():
+    """
+    Readiness probe.
+
+    Reports the state of every model used by the enabled routes.
+    With PRELOAD_MODELS on, the app is ready once all of them are loaded
+    and warmed up; in lazy mode it is ready unless a model failed to load.
+
+    Returns (200 when ready, 503 otherwise):
+    {
+        "ready": true,
+        "preload": false,
+        "models": {
+            "nllb": {"state": "ready", "load_seconds": 12.4, "warmup_seconds": 0.8, "error": null}
+        }
+    }
+    """
+    names = current_app.config.get("MODELS", [])
+    preload = current_app.config.get("PRELOAD_MODELS", False)
+    models = models_status(names)
+
+    if preload:
+        is_ready = all(m["state"] == READY for m in models.values())
+    else:
+        is_ready = not any(m["state"] == FAILED for m in models.values())
+
+    body = {"ready": is_ready, "preload": preload, "models": models}
+    return jsonify(body), (200 if is_ready else 503)
@@ -1,9 +1,22 @@
+import base64
+import binascii
+
 from flask import Blueprint, request, jsonify
-from utils.module2_utils import normalize_text
-from services.scoring_service import compute_pronunciation_score
+from utils.module2_utils import normalize_text, LANGUAGES
+from services.scoring_service import (
+    compute_pronunciation_score,
+    compute_transliteration_score,
+    score_batch,
+    AudioTooLongError,
+)
+from services.stt_service import AVAILABLE_MODELS, AUTO_LANGUAGE
+from utils.config_utils import env_int
 
 score_bp = Blueprint("score", __name__)
 
+# Most (reference, attempt) pairs accepted by one /score/batch request
+SCORE_BATCH_MAX = env_int("SCORE_BATCH_MAX", 1000)
+
 
 @score_bp.route("/score", methods=["POST"])
 def score():
@@ -16,25 +29,67 @@ def score():
         "user_text": "good mornin"
     }
 
-    OR (in practice mode)
+    OR (in practice mode: record, score, one request)
     {
         "reference_text": "hello",
-        "user_audio": <binary>  # then STT runs inside scoring service
+        "user_audio": "<base64>",    # raw base64 or a data: URL
+        "language": "en",            # spoken language ("auto" detects it)
+        "model": "tiny"              # optional Whisper size
+    }
+    or the same fields as multipart/form-data with the recording as the
+    "user_audio" (or "audio") file. The audio is decoded in memory and
+    transcribed with the shared Whisper model (repeat recordings hit the
+    STT cache); user_text wins if both are sent.
+    → also returns "transcript", "stt_cached", "audio_seconds" and the
+      latency breakdown "decode_ms", "stt_ms", "score_ms"
+
+    OR (transliteration mode: native and romanized text compare equal)
+    {
+        "mode": "transliteration",
+        "phrase_id": 1,              # phrase bank id (or "reference_text")
+        "language": "hi",
+        "user_text": "namaste"       # romanized or native script (or "user_audio")
     }
+    → also returns "reference_text", "transliteration", "compared_as",
+      "matched_form"
 
     Returns:
     {
         "score": 84,
         "similarity": 0.84,
-        "feedback": "Good pronunciation."
+        "feedback": "Good pronunciation.",
+        "word_errors": [
+            {"op": "substitute", "reference": "morning", "attempt": "mornin", "similarity": 0.857}
+        ]
     }
     """
 
-    data = request.json or {}
+    if request.mimetype == "multipart/form-data":
+        data = request.form
+        upload = request.files.get("user_audio") or request.files.get("audio")
+        user_audio = upload.read() if upload else None
+    else:
+        data = request.json or {}
+        try:
+            user_audio = _decode_base64_audio(data.get("user_audio"))
+        except ValueError:
+            return jsonify({"error": "user_audio must be base64-encoded audio"}), 400
 
     reference = normalize_text(data.get("reference_text", ""))
     user_text = data.get("user_text")
-    user_audio = data.get("user_audio")  # optional base64 string (if implemented)
+    model = data.get("model") or None
+    mode = data.get("mode", "text")
+
+    if model and model not in AVAILABLE_MODELS:
+        return jsonify({"error": f"Invalid model: {model} (available: {AVAILABLE_MODELS})"}), 400
+
+    if mode == "transliteration":
+        return _score_transliteration(data, reference, user_text, user_audio, model)
+
+    if mode != "text":
+        return jsonify({"error": f"Unknown mode: {mode}"}), 400
+
+    language = data.get("language", "en")
 
     # Validation
     if not reference:
@@ -43,15 +98,139 @@ def score():
     if not user_text and not user_audio:
         return jsonify({"error": "Provide either user_text or user_audio"}), 400
 
+    if language != AUTO_LANGUAGE and language not in LANGUAGES:
+        return jsonify({"error": f"Unsupported language: {language}"}), 400
+
     try:
         # If audio is given, scoring service will run STT internally
         result = compute_pronunciation_score(
             reference=reference,
             user_text=user_text,
-            user_audio=user_audio
+            user_audio=user_audio,
+            language=language,
+            model=model
         )
 
         return jsonify(result)
 
+    except AudioTooLongError as e:
+        return jsonify({"error": str(e)}), 413
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def _decode_base64_audio(value):
+    """Bytes of a base64 (or data: URL) string; None when absent."""
+    if not value:
+        return None
+    if not isinstance(value, str):
+        raise ValueError("not a string")
+    if value.startswith("data:"):
+        value = value.partition(",")[2]
+    try:
+        return base64.b64decode(value, validate=True)
+    except binascii.Error as e:
+        raise ValueError(str(e))
+
+
+def _score_transliteration(data, reference, user_text, user_audio, model):
+    phrase_id = data.get("phrase_id")
+    language = data.get("language")
+
+    if phrase_id is None and not reference:
+        return jsonify({"error": "phrase_id or reference_text is required"}), 400
+
+    if (phrase_id is not None or language) and language not in LANGUAGES:
+        return jsonify({"error": f"Unsupported language: {language}"}), 400
+
+    if not user_text and not user_audio:
+        return jsonify({"error": "Provide either user_text or user_audio"}), 400
+
+    try:
+        return jsonify(compute_transliteration_score(
+            user_text=user_text,
+            phrase_id=phrase_id,
+            language=language,
+            reference=reference,
+            user_audio=user_audio,
+            model=model,
+        ))
+
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+
+    except AudioTooLongError as e:
+        return jsonify({"error": str(e)}), 413
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@score_bp.route("/score/batch", methods=["POST"])
+def score_batch_route():
+    """
+    Batch Pronunciation Scoring (e.g. a whole class at once)
+
+    Expected JSON, either (reference, attempt) pairs:
+    {
+        "pairs": [
+            {"reference_text": "good morning", "user_text": "good mornin"},
+            {"reference_text": "thank you", "user_text": "thank you"}
+        ]
+    }
+
+    or one reference against many attempts:
+    {
+        "reference_text": "good morning",
+        "attempts": ["good mornin", "good morning", "morning"]
+    }
+
+    Optional: "word_errors": true to add the per-word alignment to each
+    result (much slower than the scores alone, so off by default).
+
+    Returns:
+    {
+        "results": [ {"score": 68, "similarity": 0.688, "feedback": "..."}, ... ],
+        "stats": {
+            "count": 3, "mean_score": 81.3, "median_score": 84.0,
+            "min_score": 58, "max_score": 100, "std_score": 17.4,
+            "mean_similarity": 0.82,
+            "feedback_counts": {"Excellent pronunciation!": 1, ...}
+        }
+    }
+    """
+
+    data = request.json or {}
+    pairs = data.get("pairs")
+
+    if pairs is not None:
+        if not isinstance(pairs, list) or not all(isinstance(p, dict) for p in pairs):
+            return jsonify({"error": "pairs must be a list of {reference_text, user_text} objects"}), 400
+        references = [p.get("reference_text") or "" for p in pairs]
+        attempts = [p.get("user_text") or "" for p in pairs]
+    else:
+        reference = data.get("reference_text") or ""
+        attempts = data.get("attempts")
+        if not isinstance(attempts, list):
+            return jsonify({"error": "Provide either pairs or reference_text with attempts"}), 400
+        attempts = [a or "" for a in attempts]
+        references = [reference] * len(attempts)
+
+    if not references:
+        return jsonify({"error": "Nothing to score"}), 400
+
+    if len(references) > SCORE_BATCH_MAX:
+        return jsonify({"error": f"At most {SCORE_BATCH_MAX} attempts per batch"}), 413
+
+    if not all(isinstance(t, str) for t in references + attempts):
+        return jsonify({"error": "reference_text and attempts must be strings"}), 400
+
+    if not all(normalize_text(r) for r in set(references)):
+        return jsonify({"error": "reference_text is required"}), 400
+
+    try:
+        return jsonify(score_batch(references, attempts, word_errors=bool(data.get("word_errors", False))))
+
     except Exception as e:
         return jsonify({"error": str(e)}), 500
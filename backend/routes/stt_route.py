@@ -1,30 +1,298 @@
 from flask import Blueprint, request, jsonify
-from services.stt_service import speech_to_text
+from utils.audio_utils import decode_audio_bytes, SAMPLE_RATE
+from services.stt_jobs import jobs, QueueFullError, CallbackNotAllowedError, DONE, SYNC_MAX_SECONDS, SYNC_TIMEOUT_SECONDS
+from services.stt_stream import open_session, get_session, close_session, TooManySessionsError
+from services.stt_service import registry, AVAILABLE_MODELS, AUTO_LANGUAGE, get_cache_stats
+from utils.module2_utils import LANGUAGES
 
 stt_bp = Blueprint("stt", __name__)
 
 
+def _validate(language, model):
+    """400 response for an unsupported language or model, else None."""
+    if language != AUTO_LANGUAGE and language not in LANGUAGES:
+        return jsonify({"error": f"Invalid language: {language}"}), 400
+
+    if model and model not in AVAILABLE_MODELS:
+        return jsonify({"error": f"Invalid model: {model} (available: {AVAILABLE_MODELS})"}), 400
+
+    return None
+
+
 @stt_bp.route("/stt", methods=["POST"])
 def stt():
     """
-    Speech-to-Text API
+    Speech-to-Text API (synchronous, short clips)
     Expects:
         - audio file (multipart/form-data)
-        - language code (optional)
+        - language code (optional, default "en"; "auto" detects it)
+        - model (optional): Whisper size, e.g. "tiny" | "base" | "small"
 
     Returns:
-        { "text": "recognized speech" }
+        {
+            "text": "recognized speech",
+            "segments": [{"start": 0.42, "end": 2.1, "text": "recognized speech"}],
+            "cached": false,         # true when the same audio was transcribed before
+            "language": "hi",
+            "language_probability": 0.94,   # language="auto" only
+            "detect_ms": 38.5               # language="auto" only
+        }
+
+    The clip is trimmed of silence, split at pauses and transcribed by the
+    STT worker pool in parallel; this request waits for the result. Clips longer than STT_SYNC_MAX_SECONDS are rejected
+    with 413; submit those to /stt/jobs instead.
+    """
+
+    if "audio" not in request.files:
+        return jsonify({"error": "Missing audio file"}), 400
+
+    language = request.form.get("language", "en")
+    model = request.form.get("model") or None
+
+    error = _validate(language, model)
+    if error:
+        return error
+
+    try:
+        samples = decode_audio_bytes(request.files["audio"].read())
+
+        if len(samples) > SYNC_MAX_SECONDS * SAMPLE_RATE:
+            return jsonify({
+                "error": f"Clip longer than {SYNC_MAX_SECONDS}s, use POST /stt/jobs"
+            }), 413
+
+        job_id = jobs.submit(samples, language, model)
+        job = jobs.wait(job_id, timeout=SYNC_TIMEOUT_SECONDS)
+
+        if job["status"] != DONE:
+            return jsonify({"error": job.get("error") or "Transcription timed out", "job_id": job_id}), 500
+
+        return jsonify({
+            k: job[k]
+            for k in ("text", "segments", "cached", "language", "language_probability", "detect_ms")
+            if k in job
+        })
+
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 503
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@stt_bp.route("/stt/jobs", methods=["POST"])
+def stt_submit_job():
+    """
+    Queue an asynchronous transcription.
+    Expects:
+        - audio file (multipart/form-data)
+        - language code (optional, default "en"; "auto" detects it)
+        - model (optional): Whisper size, e.g. "small" for best accuracy
+        - callback_url (optional): the finished job is POSTed there as JSON;
+          the host must be listed in STT_CALLBACK_HOSTS (callbacks are off
+          when that is empty) and resolve to a public address
+
+    Returns (202):
+        { "job_id": "3f2a…", "status": "queued" }
+
+    503 when the job queue is full.
     """
 
     if "audio" not in request.files:
         return jsonify({"error": "Missing audio file"}), 400
 
-    audio_file = request.files["audio"]
     language = request.form.get("language", "en")
+    model = request.form.get("model") or None
+    callback_url = request.form.get("callback_url") or None
+
+    error = _validate(language, model)
+    if error:
+        return error
+
+    try:
+        samples = decode_audio_bytes(request.files["audio"].read())
+        job_id = jobs.submit(samples, language, model, callback_url)
+        return jsonify({"job_id": job_id, "status": "queued"}), 202
+
+    except CallbackNotAllowedError as e:
+        return jsonify({"error": str(e)}), 400
+
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 503
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@stt_bp.route("/stt/jobs/<job_id>", methods=["GET"])
+def stt_job_status(job_id):
+    """
+    Poll a transcription job.
+
+    Returns:
+    {
+        "job_id": "3f2a…",
+        "status": "done",            # queued | running | done | failed
+        "text": "recognized speech", # when done
+        "language": "ta",            # detected when submitted with language="auto"
+        "language_probability": 0.88, "detect_ms": 40.3,
+        "segments": [{"start": 0.42, "end": 2.1, "text": "..."}, ...],
+        "error": "...",              # when failed
+        "audio_seconds": 184.0,      # upload length
+        "speech_seconds": 96.3,      # after dropping silence
+        "chunks": 4,                 # transcribed in parallel
+        "cached": false,             # served from the transcript cache
+        "queue_ms": 35.1, "transcribe_ms": 8140.7, "total_ms": 2281.0
+    }
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job: {job_id}"}), 404
+
+    return jsonify(job)
+
+
+@stt_bp.route("/stt/jobs", methods=["GET"])
+def stt_jobs_stats():
+    """
+    STT worker pool status.
+
+    Returns:
+    {
+        "workers": 2, "workers_alive": 2,
+        "queue_size": 32, "queue_depth": 3,
+        "jobs": {"queued": 3, "running": 2, "done": 40, "failed": 0},
+        "avg_queue_ms": 410.2, "avg_transcribe_ms": 2390.5
+    }
+    """
+    return jsonify(jobs.stats())
+
+
+@stt_bp.route("/stt/stream", methods=["POST"])
+def stt_stream_open():
+    """
+    Open a streaming transcription session.
+
+    Optional JSON:
+    { "language": "en", "model": "tiny" }    # language may be "auto"; model default: STT_STREAM_MODEL
+
+    Returns (201):
+    { "session_id": "9c1e…", "sample_rate": 16000, "format": "s16le", "channels": 1 }
+
+    Then POST raw PCM chunks to /stt/stream/<session_id> (partial transcripts)
+    and finish with POST /stt/stream/<session_id>/end (final transcript).
+    Reuse one keep-alive connection for the whole session.
+    """
+    data = request.get_json(silent=True) or {}
+    language = data.get("language", "en")
+    model = data.get("model") or None
+
+    error = _validate(language, model)
+    if error:
+        return error
+
+    try:
+        session = open_session(language, model)
+        return jsonify({
+            "session_id": session.session_id,
+            "sample_rate": SAMPLE_RATE,
+            "format": "s16le",
+            "channels": 1,
+            "model": session.model,
+        }), 201
+
+    except TooManySessionsError as e:
+        return jsonify({"error": str(e)}), 503
+
+
+@stt_bp.route("/stt/stream/<session_id>", methods=["POST"])
+def stt_stream_append(session_id):
+    """
+    Append audio to a session.
+    Body: raw 16 kHz mono s16le PCM (application/octet-stream)
+
+    Returns the current partial transcript:
+    {
+        "session_id": "9c1e…", "final": false,
+        "text": "i would like a",      # stable + live window
+        "stable_text": "",             # will not change any more
+        "updated": true,               # false if Whisper was not re-run for this chunk
+        "decode_ms": 180.4, "audio_seconds": 2.0, "decodes": 2
+    }
+    """
+    session = get_session(session_id)
+    if session is None:
+        return jsonify({"error": f"Unknown session: {session_id}"}), 404
+
+    pcm = request.get_data()
+    if not pcm:
+        return jsonify({"error": "Missing PCM audio"}), 400
 
     try:
-        text = speech_to_text(audio_file, language)
-        return jsonify({"text": text})
+        with session.lock:
+            return jsonify(session.append(pcm))
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+@stt_bp.route("/stt/stream/<session_id>/end", methods=["POST"])
+def stt_stream_end(session_id):
+    """
+    Close a session and return the final transcript (same shape, "final": true).
+    Any PCM in the body is appended before the final decode.
+    """
+    session = close_session(session_id)
+    if session is None:
+        return jsonify({"error": f"Unknown session: {session_id}"}), 404
+
+    try:
+        with session.lock:
+            pcm = request.get_data()
+            if pcm:
+                session.append(pcm)
+            return jsonify(session.finish())
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@stt_bp.route("/stt/models", methods=["GET"])
+def stt_models():
+    """
+    Whisper model registry, for sizing nodes.
+
+    Returns:
+    {
+        "available": ["tiny", "base", "small"],
+        "web": {                         # streaming sessions, /score (this process)
+            "default": "base", "budget_mb": 1365, "loaded_mb": 139.6, "evictions": 0,
+            "deployment_budget_mb": 4096, "processes": 3,   # budget = deployment / processes
+            "models": {
+                "tiny": {"state": "ready", "load_seconds": 0.8, "resident_mb": 72.1,
+                         "inferences": 40, "avg_inference_ms": 95.3, ...},
+                ...
+            }
+        },
+        "workers": { "<pid>": {...same shape...} }   # /stt and /stt/jobs workers
+    }
+    """
+    return jsonify({
+        "available": AVAILABLE_MODELS,
+        "web": registry.stats(),
+        "workers": {str(pid): stats for pid, stats in jobs.model_stats().items()},
+    })
+
+
+@stt_bp.route("/stt/cache/stats", methods=["GET"])
+def stt_cache_stats():
+    """
+    Transcript cache counters (keyed by decoded PCM hash + language + model).
+
+    Returns:
+    {
+        "hits": 52, "misses": 18, "evictions": 0, "hit_rate": 0.7429,
+        "memory": {...}, "disk": {...}
+    }
+    """
+    return jsonify(get_cache_stats())
@@ -1,6 +1,17 @@
-from flask import Blueprint, request, jsonify
-from utils.module2_utils import LANGUAGES, normalize_text
-from services.translate_service import translate_text
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from utils.module2_utils import LANGUAGES, normalize_list, split_sentences
+from utils.stream_utils import sse_event, SSE_HEADERS
+from services.translate_service import (
+    translate_with_info,
+    translate_multi,
+    translate_sentences,
+    iter_translate_sentences,
+    iter_translate_tokens,
+    get_cache_stats,
+    LANG_MAP,
+    GENERATION_PROFILES,
+    DEFAULT_PROFILE
+)
 
 translate_bp = Blueprint("translate", __name__)
 
@@ -14,20 +25,37 @@ def translate():
     {
         "text": "hello",
         "source": "en",
-        "target": "hi"
+        "target": "hi",
+        "profile": "fast",       # optional: fast | quality | budget
+        "stream": false          # optional, see below
     }
 
     Returns:
     {
-        "translated_text": "नमस्ते"
+        "translated_text": "नमस्ते",
+        "served_by": "phrase_bank",  # rule | phrase_bank | cache | model
+        "profile": "fast",
+        "generated_tokens": 0        # tokens decoded by the model for this request
     }
+
+    Multi-sentence text is split on sentence boundaries (. ! ? । ॥),
+    translated as one batch and joined back in order; the response then
+    also lists the per-sentence "segments" (served_by may be "mixed").
+
+    With "stream": true the response is text/event-stream with one
+    `segment` event per sentence, in order, as soon as it is translated,
+    followed by a final `done` event.
     """
 
     data = request.json or {}
-    
-    text = normalize_text(data.get("text", ""))
+
+    # Split the raw text first: normalization strips sentence punctuation
+    sentences = [s for s in normalize_list(split_sentences(data.get("text", ""))) if s]
+    text = " ".join(sentences)
+    stream = bool(data.get("stream", False))
     source = data.get("source")
     target = data.get("target")
+    profile = data.get("profile") or DEFAULT_PROFILE
 
     # Validate input
     if not text:
@@ -39,9 +67,149 @@ def translate():
     if target not in LANGUAGES:
         return jsonify({"error": f"Invalid target language: {target}"}), 400
 
+    if profile not in GENERATION_PROFILES:
+        return jsonify({"error": f"Invalid profile: {profile}"}), 400
+
     try:
-        translated = translate_text(text, source, target)
-        return jsonify({"translated_text": translated})
+        if stream:
+            return Response(
+                stream_with_context(_stream_segments(sentences, source, target, profile)),
+                mimetype="text/event-stream",
+                headers=SSE_HEADERS,
+            )
+
+        if len(sentences) > 1:
+            return jsonify(translate_sentences(sentences, source, target, profile))
+
+        return jsonify(translate_with_info(text, source, target, profile))
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+def _stream_segments(sentences, source, target, profile):
+    """SSE generator: one event per translated sentence, then `done`."""
+    try:
+        for segment in iter_translate_sentences(sentences, source, target, profile):
+            yield sse_event(segment, event="segment")
+        yield sse_event({"segments": len(sentences)}, event="done")
+
+    except Exception as e:
+        yield sse_event({"error": str(e)}, event="error")
+
+
+@translate_bp.route("/translate/multi", methods=["POST"])
+def translate_multi_targets():
+    """
+    Translate one text into many languages in a single call.
+    The source is encoded once and all targets are decoded as one batch.
+
+    Expected JSON:
+    {
+        "text": "good morning",
+        "source": "en",
+        "targets": ["hi", "ta", "te"],   # optional, default: every supported target
+        "profile": "fast"                # optional
+    }
+
+    Returns:
+    {
+        "translations": {"hi": "सुप्रभात", "ta": "காலை வணக்கம்", ...},
+        "served_by": {"hi": "phrase_bank", ...},
+        "profile": "fast",
+        "generated_tokens": 0
+    }
+    """
+
+    data = request.json or {}
+
+    text = " ".join(s for s in normalize_list(split_sentences(data.get("text", ""))) if s)
+    source = data.get("source")
+    profile = data.get("profile") or DEFAULT_PROFILE
+    targets = data.get("targets") or [t for t in LANG_MAP if t != source]
+
+    if not text:
+        return jsonify({"error": "Text is required"}), 400
+
+    if source not in LANGUAGES:
+        return jsonify({"error": f"Invalid source language: {source}"}), 400
+
+    invalid = [t for t in targets if t not in LANG_MAP]
+    if invalid:
+        return jsonify({"error": f"Invalid target languages: {invalid}"}), 400
+
+    if profile not in GENERATION_PROFILES:
+        return jsonify({"error": f"Invalid profile: {profile}"}), 400
+
+    try:
+        # Keep order, drop duplicates
+        targets = list(dict.fromkeys(targets))
+        return jsonify(translate_multi(text, source, targets, profile))
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@translate_bp.route("/translate/stream", methods=["POST"])
+def translate_stream():
+    """
+    Token-level streaming translation (Server-Sent Events).
+
+    Expected JSON: same as /translate
+    {
+        "text": "how are you doing today",
+        "source": "en",
+        "target": "hi",
+        "profile": "fast"        # optional (beam profiles stream greedily)
+    }
+
+    Returns text/event-stream:
+        event: token   data: {"index": 0, "text": "आज"}
+        event: token   data: {"index": 0, "text": " आप"}
+        ...
+        event: done    data: {"translated_text": "...", "served_by": ["model"], "profile": "fast",
+                              "first_token_ms": 85.2, "total_ms": 910.4}
+    """
+
+    data = request.json or {}
+
+    sentences = [s for s in normalize_list(split_sentences(data.get("text", ""))) if s]
+    source = data.get("source")
+    target = data.get("target")
+    profile = data.get("profile") or DEFAULT_PROFILE
+
+    if not sentences:
+        return jsonify({"error": "Text is required"}), 400
+
+    if source not in LANGUAGES:
+        return jsonify({"error": f"Invalid source language: {source}"}), 400
+
+    if target not in LANGUAGES:
+        return jsonify({"error": f"Invalid target language: {target}"}), 400
+
+    if profile not in GENERATION_PROFILES:
+        return jsonify({"error": f"Invalid profile: {profile}"}), 400
+
+    def generate():
+        try:
+            for event, payload in iter_translate_tokens(sentences, source, target, profile):
+                yield sse_event(payload, event=event)
+
+        except Exception as e:
+            yield sse_event({"error": str(e)}, event="error")
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream", headers=SSE_HEADERS)
+
+
+@translate_bp.route("/translate/cache/stats", methods=["GET"])
+def translate_cache_stats():
+    """
+    Translation cache counters (memory + disk tiers).
+
+    Returns:
+    {
+        "hits": 120, "misses": 14, "evictions": 0, "hit_rate": 0.8955,
+        "memory": {...}, "disk": {...}
+    }
+    """
+    return jsonify(get_cache_stats())
@@ -1,27 +1,47 @@
-from flask import Blueprint, request, jsonify, send_file
-from services.tts_service import text_to_speech
+from itertools import chain
+import io
+import zipfile
+
+from flask import Blueprint, Response, request, jsonify, send_file, stream_with_context
+from services.tts_service import (
+    cached_speech_path,
+    stream_speech,
+    synthesize_batch,
+    get_cache_stats,
+    MIMETYPE,
+    engine,
+)
 from utils.module2_utils import normalize_text, LANGUAGES
-import tempfile
-import os
+from utils.config_utils import env_int
 
 tts_bp = Blueprint("tts", __name__)
 
+# Browser/CDN cache lifetime for rendered audio (same input → same audio)
+TTS_MAX_AGE = env_int("TTS_HTTP_MAX_AGE", 7 * 24 * 3600)
+
 
-@tts_bp.route("/tts", methods=["POST"])
+@tts_bp.route("/tts", methods=["POST", "GET"])
 def tts():
     """
     Text-to-Speech API
 
-    Expected JSON:
+    Expected JSON (POST) or query string (GET):
     {
         "text": "hello",
         "language": "en"
     }
 
-    Returns: Audio file (MP3/WAV) as binary stream
+    Returns: Audio file (MP3, or WAV with TTS_ENGINE=local) as binary stream
+
+    Cached audio is served with an ETag, Cache-Control and Range support
+    (206 partial content, 304 on If-None-Match). GET makes the response
+    cacheable by browsers and CDNs. On a cache miss the audio is streamed
+    (chunked) as the engine produces it and cached once complete; that
+    response is sent with Cache-Control: no-store and no ETag, since a
+    stream cut short by an engine error must not be cached downstream.
     """
 
-    data = request.json or {}
+    data = request.args if request.method == "GET" else (request.json or {})
     text = normalize_text(data.get("text", ""))
     language = data.get("language", "en")
 
@@ -32,20 +52,105 @@ def tts():
         return jsonify({"error": f"Unsupported language: {language}"}), 400
 
     try:
-        # Generate audio using TTS service
-        audio_path = text_to_speech(text, language)
-
-        # Send the audio file back to the client
-        return send_file(
-            audio_path,
-            mimetype="audio/mp3",
-            as_attachment=False
+        audio_path = cached_speech_path(text, language)
+        if audio_path is not None:
+            response = send_file(
+                audio_path,
+                mimetype=MIMETYPE,
+                as_attachment=False,
+                conditional=True,
+                etag=audio_path.stem,
+                max_age=TTS_MAX_AGE,
+            )
+            response.headers["X-TTS-Cache"] = "hit"
+            return response
+
+        # Pull the first chunk here so engine errors still become a 500
+        chunks = stream_speech(text, language)
+        first = next(chunks, b"")
+
+        # The body doesn't exist yet and may end early: only finished cache
+        # files (above) are advertised as cacheable
+        response = Response(stream_with_context(chain([first], chunks)), mimetype=MIMETYPE)
+        response.cache_control.no_store = True
+        response.headers["X-TTS-Cache"] = "miss"
+        return response
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@tts_bp.route("/tts/batch", methods=["POST"])
+def tts_batch():
+    """
+    Batch Text-to-Speech: sentences are synthesized concurrently and
+    stitched back together in order.
+
+    Expected JSON, either one paragraph:
+    {
+        "text": "Good morning. How are you? See you at the station.",
+        "language": "en",
+        "gap_ms": 150            # optional silence between sentences
+    }
+    → one audio file
+
+    or a list of texts:
+    {
+        "texts": ["Good morning.", "Thank you. See you soon."],
+        "language": "hi"
+    }
+    → application/zip with 01.mp3, 02.mp3, ... (one per text, in order)
+    """
+
+    data = request.json or {}
+    language = data.get("language", "en")
+    texts = data.get("texts")
+    single = texts is None
+    if single:
+        texts = [data.get("text", "")]
+
+    try:
+        gap_ms = max(0, int(data.get("gap_ms", 0)))
+    except (TypeError, ValueError):
+        return jsonify({"error": "gap_ms must be an integer"}), 400
+
+    if not isinstance(texts, list) or not texts or not all(isinstance(t, str) and t.strip() for t in texts):
+        return jsonify({"error": "Text is required"}), 400
+
+    if language not in LANGUAGES:
+        return jsonify({"error": f"Unsupported language: {language}"}), 400
+
+    try:
+        clips = synthesize_batch(texts, language, gap_ms)
+
+        if single:
+            return Response(clips[0], mimetype=MIMETYPE)
+
+        buffer = io.BytesIO()
+        # Audio is already compressed: store, don't deflate
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+            for i, clip in enumerate(clips, start=1):
+                archive.writestr(f"{i:02d}{engine.suffix}", clip)
+
+        return Response(
+            buffer.getvalue(),
+            mimetype="application/zip",
+            headers={"Content-Disposition": "attachment; filename=tts_batch.zip"},
         )
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-    finally:
-        # Clean temporary file
-        if "audio_path" in locals() and os.path.exists(audio_path):
-            os.remove(audio_path)
+
+@tts_bp.route("/tts/cache/stats", methods=["GET"])
+def tts_cache_stats():
+    """
+    TTS audio cache counters.
+
+    Returns:
+    {
+        "files": 812, "bytes": 10485760, "max_bytes": 268435456,
+        "hits": 950, "misses": 40, "evictions": 0, "hit_rate": 0.9596
+    }
+    """
+    return jsonify(get_cache_stats())
@@ -0,0 +1,124 @@
+"""
+Batch Scoring Throughput Benchmark
+----------------------------------
+Simulates a classroom: every phrase of the phrase bank (one language
+column) answered by --students learners, and scores all attempts through
+
+✔ /score        one POST per attempt (today's dashboard path)
+✔ /score/batch  all pairs, in as few POSTs as SCORE_BATCH_MAX allows
+✔ /score/batch  one POST per phrase (reference_text + attempts)
+✔ the service functions directly, without HTTP / JSON overhead
+
+Requests go through Flask's in-process test client, so the numbers are
+scoring + request handling cost without network latency. Every response
+must be 200 (a rejected batch would otherwise time as a fast one), and
+each path reports the median of --repeat runs.
+
+Usage:
+    python benchmark_score_batch.py
+    python benchmark_score_batch.py --language hi --students 40 --phrases 50 --repeat 7
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+os.chdir(BACKEND_DIR)
+
+from app1 import create_app  # noqa: E402
+from routes.score_route import SCORE_BATCH_MAX  # noqa: E402
+from services.scoring_service import compute_pronunciation_score, score_batch  # noqa: E402
+from utils.module2_utils import load_phrase_bank, PHRASE_BANK_COLUMNS  # noqa: E402
+
+
+def make_attempt(text: str, rng: random.Random) -> str:
+    """A plausible imperfect attempt at `text`."""
+    kind = rng.choice(["drop_first", "swap", "drop_word", "exact"])
+    if kind == "drop_first" and len(text) > 1:
+        return text[1:]
+    if kind == "swap" and len(text) > 1:
+        i = rng.randrange(len(text))
+        return text[:i] + rng.choice("aeiou") + text[i + 1:]
+    words = text.split()
+    if kind == "drop_word" and len(words) > 1:
+        del words[rng.randrange(len(words))]
+        return " ".join(words)
+    return text
+
+
+def timed(fn, repeat: int) -> float:
+    """Median seconds per run over `repeat` runs."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return statistics.median(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--language", default="en", choices=sorted(PHRASE_BANK_COLUMNS))
+    parser.add_argument("--phrases", type=int, default=25)
+    parser.add_argument("--students", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    column = PHRASE_BANK_COLUMNS[args.language]
+    references = [row[column] for row in load_phrase_bank() if row.get(column)][:args.phrases]
+    groups = [(ref, [make_attempt(ref, rng) for _ in range(args.students)]) for ref in references]
+    pairs = [(ref, attempt) for ref, attempts in groups for attempt in attempts]
+
+    client = create_app(enabled_routes=["score"]).test_client()
+
+    def post(path, body):
+        response = client.post(path, json=body)
+        assert response.status_code == 200, f"{path}: {response.status_code} {response.get_json()}"
+
+    def per_request():
+        for ref, attempt in pairs:
+            post("/score", {"reference_text": ref, "user_text": attempt})
+
+    def batched_pairs():
+        for start in range(0, len(pairs), SCORE_BATCH_MAX):
+            post("/score/batch", {
+                "pairs": [{"reference_text": r, "user_text": a} for r, a in pairs[start:start + SCORE_BATCH_MAX]],
+            })
+
+    def batch_per_phrase():
+        for ref, attempts in groups:
+            for start in range(0, len(attempts), SCORE_BATCH_MAX):
+                post("/score/batch", {"reference_text": ref, "attempts": attempts[start:start + SCORE_BATCH_MAX]})
+
+    cases = [
+        ("POST /score x N", per_request),
+        ("POST /score/batch (pairs)", batched_pairs),
+        ("POST /score/batch per phrase", batch_per_phrase),
+        ("compute_pronunciation_score", lambda: [compute_pronunciation_score(r, a) for r, a in pairs]),
+        ("score_batch", lambda: score_batch([r for r, _ in pairs], [a for _, a in pairs])),
+        ("score_batch (word_errors)",
+         lambda: score_batch([r for r, _ in pairs], [a for _, a in pairs], word_errors=True)),
+    ]
+
+    print(f"{len(pairs)} attempts ({len(groups)} phrases x {args.students} students, {args.language}), "
+          f"median of {args.repeat} runs, batches of <= {SCORE_BATCH_MAX}\n")
+    print(f"{'path':>30} | {'total ms':>9} | {'attempts/s':>10} | {'speedup':>7}")
+
+    baseline = None
+    for name, fn in cases:
+        fn()  # warm up
+        seconds = timed(fn, args.repeat)
+        baseline = baseline or seconds
+        print(f"{name:>30} | {seconds * 1000:9.1f} | {len(pairs) / seconds:10.0f} | {baseline / seconds:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
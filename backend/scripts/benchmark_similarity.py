@@ -0,0 +1,112 @@
+"""
+Text Similarity Microbenchmark
+------------------------------
+Times the pronunciation-scoring similarity functions on phrase-bank-sized
+inputs: every phrase of every language column, paired with a learner-like
+attempt (dropped first letter, a swapped letter, a missing word).
+
+✔ simple_similarity          old position-aligned compare (baseline)
+✔ levenshtein_similarity     bit-parallel edit distance
+✔ levenshtein (compiled)     same, with the reference pattern pre-built
+✔ align_words                word-level alignment with backtrace
+✔ score (similarity + words) what compute_pronunciation_score now does
+
+Reports µs per call and the cost relative to the baseline, plus the mean
+score each metric gives the same attempts.
+
+Usage:
+    python benchmark_similarity.py
+    python benchmark_similarity.py --repeat 20 --seed 7
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+os.chdir(BACKEND_DIR)
+
+from utils.module2_utils import load_phrase_bank, normalize_text, PHRASE_BANK_COLUMNS  # noqa: E402
+from utils.module3_udfs import simple_similarity  # noqa: E402
+from utils.similarity import compile_pattern, levenshtein_similarity, align_words  # noqa: E402
+
+
+def make_attempt(text: str, rng: random.Random) -> str:
+    """A plausible imperfect attempt at `text`."""
+    kind = rng.choice(["drop_first", "swap", "drop_word", "exact"])
+    if kind == "drop_first" and len(text) > 1:
+        return text[1:]
+    if kind == "swap" and len(text) > 1:
+        i = rng.randrange(len(text))
+        return text[:i] + rng.choice("aeiou") + text[i + 1:]
+    words = text.split()
+    if kind == "drop_word" and len(words) > 1:
+        del words[rng.randrange(len(words))]
+        return " ".join(words)
+    return text
+
+
+def load_pairs(seed: int):
+    rng = random.Random(seed)
+    pairs = []
+    for row in load_phrase_bank():
+        for column in PHRASE_BANK_COLUMNS.values():
+            reference = normalize_text(row.get(column, ""))
+            if reference:
+                pairs.append((reference, make_attempt(reference, rng)))
+    return pairs
+
+
+def time_per_call(fn, pairs, repeat: int) -> float:
+    """Median µs per call over `repeat` passes."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for reference, attempt in pairs:
+            fn(reference, attempt)
+        runs.append((time.perf_counter() - start) / len(pairs) * 1e6)
+    return statistics.median(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    pairs = load_pairs(args.seed)
+    compiled = {reference: compile_pattern(reference) for reference, _ in pairs}
+    lengths = [len(reference) for reference, _ in pairs]
+    print(f"{len(pairs)} pairs, reference length mean {statistics.mean(lengths):.0f} / max {max(lengths)} chars\n")
+
+    def score(reference, attempt):
+        levenshtein_similarity(reference, attempt)
+        align_words(reference, attempt)
+
+    cases = [
+        ("simple_similarity", simple_similarity),
+        ("levenshtein_similarity", levenshtein_similarity),
+        ("levenshtein (compiled)", lambda r, a: levenshtein_similarity(compiled[r], a)),
+        ("align_words", align_words),
+        ("score (similarity + words)", score),
+    ]
+
+    baseline = None
+    print(f"{'function':>28} | {'µs/call':>8} | {'x baseline':>10}")
+    for name, fn in cases:
+        us = time_per_call(fn, pairs, args.repeat)
+        baseline = baseline or us
+        print(f"{name:>28} | {us:8.2f} | {us / baseline:10.2f}")
+
+    old = statistics.mean(simple_similarity(r, a) for r, a in pairs)
+    new = statistics.mean(levenshtein_similarity(r, a) for r, a in pairs)
+    print(f"\nMean similarity on the same attempts: simple {old:.3f}, levenshtein {new:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Translation Precision Benchmark (fp32 vs int8 vs bf16)
+------------------------------------------------------
+Measures, for every TRANSLATE_PRECISION mode:
+✔ Model load time
+✔ Resident memory after load (RSS) and serialized model size
+✔ Single-request latency (p50 / p95)
+✔ Batched throughput (sentences / second)
+✔ BLEU / chrF against the phrase bank, and the delta vs fp32
+
+Each mode runs in a fresh child process so memory numbers don't leak
+between modes. BLEU/chrF need `sacrebleu` (pip install sacrebleu); without
+it only speed and memory are reported.
+
+Usage:
+    python benchmark_translate_precision.py
+    python benchmark_translate_precision.py --modes fp32,int8 --target ta --limit 50
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+os.chdir(BACKEND_DIR)
+
+from utils.module2_utils import load_phrase_bank, normalize_text, PHRASE_BANK_COLUMNS  # noqa: E402
+from utils.module3_udfs import chunk_list  # noqa: E402
+
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB (Linux)."""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def model_size_mb(model) -> float:
+    """Size of the serialized state dict (covers packed int8 weights too)."""
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / (1024 * 1024)
+
+
+def load_pairs(target: str, limit: int):
+    """(english, reference translation) pairs from the phrase bank."""
+    column = PHRASE_BANK_COLUMNS[target]
+    pairs = [
+        (normalize_text(row.get("english", "")), row.get(column, ""))
+        for row in load_phrase_bank()
+    ]
+    pairs = [(src, ref) for src, ref in pairs if src and ref]
+    return pairs[:limit] if limit else pairs
+
+
+# ============================================================
+# CHILD: BENCHMARK ONE MODE
+# ============================================================
+
+def run_mode(mode: str, target: str, limit: int, batch_size: int) -> dict:
+    from services.translation_engine import load_nllb, generate_batch, cpu_supports_bf16
+
+    pairs = load_pairs(target, limit)
+    sources = [src for src, _ in pairs]
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    tokenizer, model = load_nllb(mode)
+    load_seconds = time.perf_counter() - start
+
+    # Warmup (not timed)
+    generate_batch(tokenizer, model, ["hello"], "en", target)
+
+    latencies = []
+    for text in sources:
+        start = time.perf_counter()
+        generate_batch(tokenizer, model, [text], "en", target)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    hypotheses = []
+    start = time.perf_counter()
+    for chunk in chunk_list(sources, batch_size):
+        hypotheses += generate_batch(tokenizer, model, chunk, "en", target)
+    batch_seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "effective_mode": "fp32" if mode == "bf16" and not cpu_supports_bf16() else mode,
+        "sentences": len(sources),
+        "load_s": round(load_seconds, 2),
+        "rss_mb": round(rss_mb() - rss_before, 1),
+        "model_mb": round(model_size_mb(model), 1),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 1),
+        "throughput_sps": round(len(sources) / batch_seconds, 2),
+        "hypotheses": hypotheses,
+        "references": [ref for _, ref in pairs],
+    }
+
+
+# ============================================================
+# PARENT: ORCHESTRATE + REPORT
+# ============================================================
+
+def quality_scores(hypotheses, references):
+    """BLEU / chrF if sacrebleu is installed, else None."""
+    try:
+        import sacrebleu
+    except ImportError:
+        return None, None
+
+    bleu = sacrebleu.corpus_bleu(hypotheses, [references]).score
+    chrf = sacrebleu.corpus_chrf(hypotheses, [references]).score
+    return round(bleu, 2), round(chrf, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default="fp32,int8,bf16")
+    parser.add_argument("--target", default="hi", choices=sorted(PHRASE_BANK_COLUMNS))
+    parser.add_argument("--limit", type=int, default=0, help="Only use the first N phrases (0 = all)")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.child, args.target, args.limit, args.batch_size), ensure_ascii=False))
+        return
+
+    results = []
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        print(f"Benchmarking {mode} ...", flush=True)
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", mode, "--target", args.target,
+             "--limit", str(args.limit), "--batch-size", str(args.batch_size)],
+            capture_output=True, text=True,
+        )
+        if out.returncode != 0:
+            print(f"❌ {mode} failed:\n{out.stderr}")
+            continue
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        result["bleu"], result["chrf"] = quality_scores(result["hypotheses"], result["references"])
+        results.append(result)
+
+    baseline = next((r for r in results if r["mode"] == "fp32"), None)
+
+    print()
+    header = ["mode", "load_s", "rss_mb", "model_mb", "p50_ms", "p95_ms", "throughput_sps", "bleu", "chrf", "Δbleu", "Δchrf"]
+    print(" | ".join(f"{h:>14}" for h in header))
+    for r in results:
+        if baseline and r["bleu"] is not None:
+            r["Δbleu"] = round(r["bleu"] - baseline["bleu"], 2)
+            r["Δchrf"] = round(r["chrf"] - baseline["chrf"], 2)
+        label = r["mode"] if r["mode"] == r["effective_mode"] else f"{r['mode']}→{r['effective_mode']}"
+        row = [label] + [r.get(h) for h in header[1:]]
+        print(" | ".join(f"{str(v):>14}" for v in row))
+
+    if results and results[0]["bleu"] is None:
+        print("\n(sacrebleu not installed: BLEU/chrF skipped)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+TTS Engine Benchmark (concurrent load)
+--------------------------------------
+Fires N synthesis requests at each engine from a thread pool, bypassing
+the audio cache, and reports for every (engine, concurrency) pair:
+✔ Throughput (requests / second)
+✔ Time to first audio chunk (p50 / p95)
+✔ Total latency (p50 / p95 / p99)
+✔ Errors
+
+Engines:
+- local           offline stand-in (TTS_LOCAL_LATENCY_MS simulated latency)
+- gtts            pooled session + TTS_MAX_IN_FLIGHT limit (needs network)
+- gtts-unpooled   plain gTTS.stream(), a new connection per request
+
+Usage:
+    python benchmark_tts.py
+    python benchmark_tts.py --engines local,gtts,gtts-unpooled --concurrency 1,4,16 --requests 64
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from services.tts_engines import get_engine  # noqa: E402
+
+TEXTS = [
+    "good morning",
+    "how are you doing today",
+    "where is the railway station",
+    "thank you very much for your help",
+    "could you please speak a little more slowly",
+]
+
+
+def make_engine(name: str):
+    if name == "gtts-unpooled":
+        return get_engine("gtts", pooled=False)
+    return get_engine(name)
+
+
+def one_request(engine, text: str, language: str):
+    """(time to first chunk, total time, ok) for one synthesis."""
+    start = time.perf_counter()
+    first = None
+    try:
+        for _ in engine.stream(text, language):
+            if first is None:
+                first = time.perf_counter() - start
+        return first, time.perf_counter() - start, True
+    except Exception:
+        return first, time.perf_counter() - start, False
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[int(p * (len(values) - 1))] if values else float("nan")
+
+
+def run(engine_name: str, concurrency: int, requests: int, language: str) -> dict:
+    engine = make_engine(engine_name)
+    texts = [TEXTS[i % len(TEXTS)] for i in range(requests)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda t: one_request(engine, t, language), texts))
+    wall = time.perf_counter() - start
+
+    ok = [r for r in results if r[2]]
+    firsts = [r[0] * 1000 for r in ok if r[0] is not None]
+    totals = [r[1] * 1000 for r in ok]
+
+    return {
+        "engine": engine_name,
+        "concurrency": concurrency,
+        "rps": round(len(ok) / wall, 2),
+        "ttfb_p50": round(statistics.median(firsts), 1) if firsts else None,
+        "ttfb_p95": round(percentile(firsts, 0.95), 1) if firsts else None,
+        "p50_ms": round(statistics.median(totals), 1) if totals else None,
+        "p95_ms": round(percentile(totals, 0.95), 1) if totals else None,
+        "p99_ms": round(percentile(totals, 0.99), 1) if totals else None,
+        "errors": len(results) - len(ok),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", default="local")
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--requests", type=int, default=48)
+    parser.add_argument("--language", default="en")
+    args = parser.parse_args()
+
+    header = ["engine", "concurrency", "rps", "ttfb_p50", "ttfb_p95", "p50_ms", "p95_ms", "p99_ms", "errors"]
+    print(" | ".join(f"{h:>13}" for h in header))
+
+    for engine_name in [e.strip() for e in args.engines.split(",") if e.strip()]:
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            result = run(engine_name, concurrency, args.requests, args.language)
+            print(" | ".join(f"{str(result[h]):>13}" for h in header), flush=True)
+
+
+if __name__ == "__main__":
+    main()
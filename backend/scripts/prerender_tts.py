@@ -0,0 +1,78 @@
+"""
+Phrase Bank TTS Pre-renderer
+----------------------------
+Renders every phrase of phrase_bank_multilang.csv, in every language
+column, into the TTS disk cache so /tts serves them without calling the
+TTS engine.
+
+✔ Skips phrases that are already cached (safe to re-run)
+✔ Renders with a small thread pool (the engine is network-bound)
+✔ Reports rendered / cached / failed counts per language
+
+Point TTS_CACHE_DIR at the same directory the backend uses.
+
+Usage:
+    python prerender_tts.py
+    python prerender_tts.py --languages hi,ta --workers 8
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+os.chdir(BACKEND_DIR)
+
+from utils.module2_utils import load_phrase_bank, normalize_text, PHRASE_BANK_COLUMNS, LANGUAGES  # noqa: E402
+from services.tts_service import text_to_speech_cached, is_cached, get_cache_stats  # noqa: E402
+
+
+def render(text: str, language: str) -> str:
+    try:
+        _, cached = text_to_speech_cached(text, language)
+        return "cached" if cached else "rendered"
+    except Exception as e:
+        print(f"❌ [{language}] {text!r}: {e}")
+        return "failed"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--languages", default=",".join(PHRASE_BANK_COLUMNS),
+                        help="Comma-separated language codes (default: every phrase bank column)")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    languages = [l.strip() for l in args.languages.split(",") if l.strip() in PHRASE_BANK_COLUMNS]
+    rows = load_phrase_bank()
+
+    start = time.perf_counter()
+    for language in languages:
+        if language not in LANGUAGES:
+            continue
+
+        column = PHRASE_BANK_COLUMNS[language]
+        # Same normalization as the /tts route, so the cache keys match
+        texts = list(dict.fromkeys(normalize_text(row.get(column, "")) for row in rows))
+        texts = [t for t in texts if t]
+
+        todo = [t for t in texts if not is_cached(t, language)]
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(lambda t: render(t, language), todo))
+
+        print(f"[{language}] {len(texts)} phrases: "
+              f"{results.count('rendered')} rendered, "
+              f"{len(texts) - len(todo) + results.count('cached')} already cached, "
+              f"{results.count('failed')} failed")
+
+    stats = get_cache_stats()
+    print(f"\n✔ Done in {time.perf_counter() - start:.1f}s — cache holds "
+          f"{stats['files']} files ({stats['bytes'] / (1024 * 1024):.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
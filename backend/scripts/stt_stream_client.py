@@ -0,0 +1,101 @@
+"""
+Streaming STT Test Client
+-------------------------
+Replays a WAV file against /stt/stream at real-time speed (one chunk
+every --chunk-ms) and prints the partial transcripts as they arrive.
+
+Reports:
+✔ Latency to first partial (audio sent → first non-empty transcript)
+✔ Per-chunk request latency (p50 / p95)
+✔ Final latency (end of audio → final transcript)
+
+Non 16 kHz mono 16-bit WAVs are converted with the backend's decoder
+(needs ffmpeg).
+
+Usage:
+    python stt_stream_client.py sample.wav
+    python stt_stream_client.py sample.wav --url http://localhost:5005 --chunk-ms 250 --language hi
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import requests
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from utils.audio_utils import decode_audio_bytes, SAMPLE_RATE  # noqa: E402
+
+
+def load_pcm(path: str) -> bytes:
+    """WAV file → 16 kHz mono s16le bytes."""
+    samples = decode_audio_bytes(Path(path).read_bytes())
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("wav")
+    parser.add_argument("--url", default="http://localhost:5005")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--chunk-ms", type=int, default=250)
+    args = parser.parse_args()
+
+    pcm = load_pcm(args.wav)
+    chunk_bytes = SAMPLE_RATE * 2 * args.chunk_ms // 1000
+    chunks = [pcm[i: i + chunk_bytes] for i in range(0, len(pcm), chunk_bytes)]
+
+    # One keep-alive connection for the whole session
+    http = requests.Session()
+    r = http.post(f"{args.url}/stt/stream", json={"language": args.language})
+    r.raise_for_status()
+    session_id = r.json()["session_id"]
+    stream_url = f"{args.url}/stt/stream/{session_id}"
+    headers = {"Content-Type": "application/octet-stream"}
+
+    print(f"Session {session_id}: {len(pcm) / 2 / SAMPLE_RATE:.1f}s audio in {len(chunks)} chunks")
+
+    request_ms = []
+    first_partial_s = None
+    start = time.perf_counter()
+
+    for i, chunk in enumerate(chunks):
+        # Real-time pacing: chunk i is "captured" at i * chunk_ms
+        delay = start + i * args.chunk_ms / 1000 - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        t0 = time.perf_counter()
+        r = http.post(stream_url, data=chunk, headers=headers)
+        r.raise_for_status()
+        request_ms.append((time.perf_counter() - t0) * 1000)
+
+        partial = r.json()
+        if partial["updated"]:
+            print(f"[{partial['audio_seconds']:6.2f}s] {partial['text']}")
+        if first_partial_s is None and partial["text"]:
+            first_partial_s = time.perf_counter() - start
+
+    audio_done = time.perf_counter()
+    r = http.post(f"{stream_url}/end")
+    r.raise_for_status()
+    final = r.json()
+    final_ms = (time.perf_counter() - audio_done) * 1000
+
+    request_ms.sort()
+    print()
+    print(f"Final: {final['text']}")
+    print(f"Latency to first partial: {first_partial_s:.2f}s" if first_partial_s is not None
+          else "Latency to first partial: (no partial transcript)")
+    print(f"Chunk request p50 / p95:  {statistics.median(request_ms):.1f} / "
+          f"{request_ms[int(0.95 * (len(request_ms) - 1))]:.1f} ms")
+    print(f"Final latency:            {final_ms:.1f} ms ({final['decodes']} decodes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# services/phrase_lookup.py
+"""
+Translation fast path that runs before the model.
+
+1. Override rules (data/translation_rules.csv) – exact or prefix matches
+   that always win, e.g. "hi sir" → "नमस्ते सर".
+2. Phrase bank index – normalized text of every language column in
+   phrase_bank_multilang.csv, so a known phrase is answered with its
+   human-verified translation in another column.
+
+Both tables are built once on first use and are read-only afterwards.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import csv
+import threading
+
+from utils.module2_utils import load_phrase_bank, normalize_text, PHRASE_BANK_COLUMNS
+
+RULES_CSV_LOCATIONS = [
+    Path("data/translation_rules.csv"),
+    Path("backend/data/translation_rules.csv"),  # fallback for dev
+]
+
+_lock = threading.Lock()
+_rules: Optional[Dict[Tuple[str, str], List[Dict[str, str]]]] = None
+_index: Optional[Dict[str, Dict[str, int]]] = None
+_rows: List[Dict[str, str]] = []
+
+
+# ============================================================
+# 1. LOADING
+# ============================================================
+
+def _load_rules() -> Dict[Tuple[str, str], List[Dict[str, str]]]:
+    """(source, target) -> rules, longest pattern first."""
+    path = next((p for p in RULES_CSV_LOCATIONS if p.exists()), None)
+    rules: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
+    if path is None:
+        return rules
+
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            rule = {
+                "match": (row.get("match") or "exact").strip(),
+                "pattern": normalize_text(row.get("pattern", "")),
+                "translation": (row.get("translation") or "").strip(),
+            }
+            if rule["pattern"] and rule["translation"]:
+                key = (row["source"].strip(), row["target"].strip())
+                rules.setdefault(key, []).append(rule)
+
+    for group in rules.values():
+        group.sort(key=lambda r: len(r["pattern"]), reverse=True)
+    return rules
+
+
+def _build_index(rows: List[Dict[str, str]]) -> Dict[str, Dict[str, int]]:
+    """language -> normalized phrase -> row number."""
+    index: Dict[str, Dict[str, int]] = {}
+    for lang, column in PHRASE_BANK_COLUMNS.items():
+        entries = index.setdefault(lang, {})
+        for i, row in enumerate(rows):
+            key = normalize_text(row.get(column, ""))
+            if key and key not in entries:
+                entries[key] = i
+    return index
+
+
+def _ensure_loaded():
+    global _rules, _index, _rows
+    if _index is not None:
+        return
+    with _lock:
+        if _index is None:
+            _rules = _load_rules()
+            _rows = load_phrase_bank()
+            _index = _build_index(_rows)
+
+
+# ============================================================
+# 2. LOOKUP
+# ============================================================
+
+def match_rule(text: str, source: str, target: str) -> Optional[str]:
+    """Translation from the override table, or None."""
+    _ensure_loaded()
+    normalized = normalize_text(text)
+
+    for rule in _rules.get((source, target), []):
+        if rule["match"] == "prefix" and normalized.startswith(rule["pattern"]):
+            return rule["translation"]
+        if rule["match"] == "exact" and normalized == rule["pattern"]:
+            return rule["translation"]
+    return None
+
+
+def match_phrase(text: str, source: str, target: str) -> Optional[str]:
+    """Stored phrase-bank translation for an exact (normalized) match, or None."""
+    _ensure_loaded()
+    column = PHRASE_BANK_COLUMNS.get(target)
+    row = _index.get(source, {}).get(normalize_text(text))
+    if column is None or row is None:
+        return None
+    return _rows[row].get(column) or None
+
+
+def lookup(text: str, source: str, target: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Run the fast path.
+    Returns (translation, served_by) where served_by is "rule" or
+    "phrase_bank", or (None, None) when the model is needed.
+    """
+    translated = match_rule(text, source, target)
+    if translated is not None:
+        return translated, "rule"
+
+    translated = match_phrase(text, source, target)
+    if translated is not None:
+        return translated, "phrase_bank"
+
+    return None, None
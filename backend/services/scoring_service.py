@@ -1,44 +1,317 @@
 # services/scoring_service.py
 
-from utils.module2_utils import normalize_text
-from utils.module3_udfs import simple_similarity
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+import time
 
+import numpy as np
 
-def compute_pronunciation_score(reference: str, user_text: str = None, user_audio=None):
+from services.stt_service import transcribe_cached, AUTO_LANGUAGE
+from utils.audio_utils import decode_audio_bytes, SAMPLE_RATE
+from utils.config_utils import env_int
+from utils.module2_utils import normalize_text, load_phrase_bank, PHRASE_BANK_COLUMNS
+from utils.similarity import Pattern, compile_pattern, levenshtein_similarity, align_words, similarity_batch
+from utils.transliteration import to_shared_space
+
+# Compiled references kept for transliteration scoring (phrase id, language)
+PHRASE_CACHE_SIZE = env_int("SCORE_PHRASE_CACHE_SIZE", 1024)
+
+# Longest recorded attempt accepted for scoring (seconds)
+AUDIO_MAX_SECONDS = env_int("SCORE_AUDIO_MAX_SECONDS", 30)
+
+# (score above, feedback) from best to worst; anything lower gets POOR_FEEDBACK
+FEEDBACK = [
+    (85, "Excellent pronunciation!"),
+    (70, "Good pronunciation."),
+    (50, "Average, needs improvement."),
+]
+POOR_FEEDBACK = "Poor pronunciation. Practice more."
+
+
+class AudioTooLongError(ValueError):
+    """Recorded attempt is longer than SCORE_AUDIO_MAX_SECONDS."""
+
+
+def feedback_for(score: int) -> str:
+    for threshold, text in FEEDBACK:
+        if score > threshold:
+            return text
+    return POOR_FEEDBACK
+
+
+def _ms(start: float, end: float) -> float:
+    return round((end - start) * 1000, 1)
+
+
+def transcribe_attempt(user_audio: bytes, language: str = "en", model: str = None) -> Dict:
+    """
+    Decode a recorded attempt in memory and transcribe it with the shared
+    Whisper registry (same model instances and STT cache as /stt).
+
+    Returns:
+    {
+        "transcript": "good mornin",
+        "stt_cached": false,
+        "audio_seconds": 1.84,
+        "decode_ms": 3.2,
+        "stt_ms": 412.7,
+        "language": "hi", "language_probability": 0.93    # language="auto" only
+    }
+    """
+    start = time.perf_counter()
+    samples = decode_audio_bytes(user_audio)
+    decoded = time.perf_counter()
+
+    if len(samples) > AUDIO_MAX_SECONDS * SAMPLE_RATE:
+        raise AudioTooLongError(f"Recording longer than {AUDIO_MAX_SECONDS}s")
+
+    result, cached = transcribe_cached(samples, language, model)
+    done = time.perf_counter()
+
+    stt = {
+        "transcript": result["text"],
+        "stt_cached": cached,
+        "audio_seconds": round(len(samples) / SAMPLE_RATE, 2),
+        "decode_ms": _ms(start, decoded),
+        "stt_ms": _ms(decoded, done),
+    }
+    for key in ("language", "language_probability"):
+        if key in result:
+            stt[key] = result[key]
+    return stt
+
+
+def compute_pronunciation_score(reference: str, user_text: str = None, user_audio: bytes = None,
+                                language: str = "en", model: str = None):
     """
     Compute pronunciation score:
-    - If user_audio is given → (OPTIONAL) run STT here
+    - If user_audio (encoded audio bytes) is given instead of user_text →
+      transcribe it first (see transcribe_attempt) in `language` with the
+      Whisper size `model`
     - Then compare reference text with user_text
 
+    Similarity is character edit distance (1 - distance / longer length),
+    so a dropped or extra letter only costs that letter instead of shifting
+    every following position.
+
     Returns:
     {
         "score": int,
         "similarity": float,
-        "feedback": str
+        "feedback": str,
+        "word_errors": [          # reference words missed, wrong or added
+            {"op": "substitute", "reference": "morning", "attempt": "mornin", "similarity": 0.857},
+            {"op": "delete", "reference": "sir", "attempt": None},
+            {"op": "insert", "reference": None, "attempt": "uh"}
+        ]
     }
+    plus, for an audio attempt, transcribe_attempt()'s fields and "score_ms".
     """
 
-    # (Optional) If user_audio is provided, integrate STT here
-    # user_text = whisper_transcribe(user_audio)
+    stt = {}
+    if user_audio is not None and not user_text:
+        stt = transcribe_attempt(user_audio, language, model)
+        user_text = stt["transcript"]
+
+    start = time.perf_counter()
 
     reference = normalize_text(reference)
     user_text = normalize_text(user_text)
 
-    similarity = simple_similarity(reference, user_text)
+    similarity = levenshtein_similarity(reference, user_text)
+    word_errors = [op for op in align_words(reference, user_text) if op["op"] != "match"]
     score = int(similarity * 100)
 
-    # Generate user feedback
-    if score > 85:
-        feedback = "Excellent pronunciation!"
-    elif score > 70:
-        feedback = "Good pronunciation."
-    elif score > 50:
-        feedback = "Average, needs improvement."
+    result = {
+        "score": score,
+        "similarity": round(similarity, 3),
+        "feedback": feedback_for(score),
+        "word_errors": word_errors
+    }
+
+    if stt:
+        # Audio attempt: transcript + decode / STT / score latency breakdown
+        result.update(stt, score_ms=_ms(start, time.perf_counter()))
+    return result
+
+
+def score_batch(references: Sequence[str], attempts: Sequence[str], word_errors: bool = False) -> Dict:
+    """
+    Score many (reference, attempt) pairs in one pass.
+
+    Same per-item result as compute_pronunciation_score(), but each distinct
+    text is normalized once (a class answering one reference normalizes it
+    once) and the similarities come from one batched edit-distance run.
+    word_errors=True adds the per-pair word alignment; it runs in Python
+    per pair and costs far more than the batched scores, so it is opt-in.
+
+    Returns:
+    {
+        "results": [ {score, similarity, feedback[, word_errors]}, ... ],   # input order
+        "stats": {
+            "count": 30, "mean_score": 78.4, "median_score": 81.0,
+            "min_score": 12, "max_score": 100, "std_score": 17.9,
+            "mean_similarity": 0.791,
+            "feedback_counts": {"Excellent pronunciation!": 11, ...}
+        }
+    }
+    """
+    normalized: Dict[str, str] = {}
+
+    def norm(text):
+        text = text or ""
+        if text not in normalized:
+            normalized[text] = normalize_text(text)
+        return normalized[text]
+
+    references = [norm(r) for r in references]
+    attempts = [norm(a) for a in attempts]
+    if not references:
+        return {"results": [], "stats": {"count": 0, "feedback_counts": {}}}
+
+    similarities = similarity_batch(references, attempts)
+    scores = (similarities * 100).astype(np.int64)
+    feedback = np.select(
+        [scores > threshold for threshold, _ in FEEDBACK],
+        [text for _, text in FEEDBACK],
+        POOR_FEEDBACK,
+    )
+
+    results: List[Dict] = []
+    for k in range(len(references)):
+        result = {
+            "score": int(scores[k]),
+            "similarity": round(float(similarities[k]), 3),
+            "feedback": str(feedback[k]),
+        }
+        if word_errors:
+            result["word_errors"] = [
+                op for op in align_words(references[k], attempts[k]) if op["op"] != "match"
+            ]
+        results.append(result)
+
+    labels, counts = np.unique(feedback, return_counts=True)
+    stats = {
+        "count": len(results),
+        "mean_score": round(float(scores.mean()), 2),
+        "median_score": float(np.median(scores)),
+        "min_score": int(scores.min()),
+        "max_score": int(scores.max()),
+        "std_score": round(float(scores.std()), 2),
+        "mean_similarity": round(float(similarities.mean()), 3),
+        "feedback_counts": {str(label): int(c) for label, c in zip(labels, counts)},
+    }
+
+    return {"results": results, "stats": stats}
+
+
+# ============================================================
+# TRANSLITERATION-AWARE SCORING
+# ============================================================
+
+class CompiledReference(NamedTuple):
+    native: str
+    transliteration: str
+    forms: Tuple[Tuple[str, str, Pattern], ...]    # (label, shared-space text, pattern)
+
+
+@lru_cache(maxsize=1)
+def phrase_index() -> Dict[str, Dict[str, Dict[str, str]]]:
+    """
+    Phrase bank indexed once by id and language:
+    {"1": {"hi": {"native": "नमस्ते", "transliteration": "namaste"}, ...}, ...}
+    """
+    index: Dict[str, Dict[str, Dict[str, str]]] = {}
+    for row in load_phrase_bank():
+        index[row.get("id", "")] = {
+            language: {
+                "native": row[column],
+                "transliteration": row.get(f"{column}_transliteration", ""),
+            }
+            for language, column in PHRASE_BANK_COLUMNS.items()
+            if row.get(column)
+        }
+    return index
+
+
+def _compile_reference(native: str, transliteration: str = "") -> CompiledReference:
+    forms = []
+    for label, text in (("native", native), ("transliteration", transliteration)):
+        key = to_shared_space(text)
+        if key and all(key != f[1] for f in forms):
+            forms.append((label, key, compile_pattern(key)))
+    return CompiledReference(native, transliteration, tuple(forms))
+
+
+@lru_cache(maxsize=PHRASE_CACHE_SIZE)
+def phrase_reference(phrase_id: str, language: str) -> CompiledReference:
+    """Romanized + compiled forms of one phrase (KeyError if unknown)."""
+    entry = phrase_index().get(phrase_id, {}).get(language)
+    if entry is None:
+        raise KeyError(f"Unknown phrase {phrase_id!r} for language {language!r}")
+    return _compile_reference(entry["native"], entry["transliteration"])
+
+
+@lru_cache(maxsize=PHRASE_CACHE_SIZE)
+def text_reference(reference: str) -> CompiledReference:
+    """Same as phrase_reference() for a free reference text."""
+    return _compile_reference(reference)
+
+
+def compute_transliteration_score(user_text: str = None, phrase_id=None, language: str = None, reference: str = None,
+                                  user_audio: bytes = None, model: str = None):
+    """
+    Score an attempt in a shared romanized space, so romanized STT output
+    ("namaste") matches a native reference ("नमस्ते") and vice versa.
+
+    The reference is a phrase bank entry (phrase_id + language: compared
+    against both its native and *_transliteration forms, best one wins) or
+    a free reference text. Its romanized, compiled form is cached, so a
+    repeated attempt at the same phrase only romanizes the attempt.
+
+    user_audio is transcribed first as in compute_pronunciation_score()
+    (in `language`, or detected when no language is given).
+
+    Returns compute_pronunciation_score() fields plus:
+    {
+        "reference_text": "नमस्ते",
+        "transliteration": "namaste",
+        "compared_as": "namaste",       # attempt in the shared space
+        "matched_form": "native"        # or "transliteration"
+    }
+    """
+    if phrase_id is not None:
+        compiled = phrase_reference(str(phrase_id), language)
     else:
-        feedback = "Poor pronunciation. Practice more."
+        compiled = text_reference(normalize_text(reference))
+
+    stt = {}
+    if user_audio is not None and not user_text:
+        stt = transcribe_attempt(user_audio, language or AUTO_LANGUAGE, model)
+        user_text = stt["transcript"]
+
+    start = time.perf_counter()
+    attempt = to_shared_space(user_text)
 
-    return {
+    similarity, label, key = 0.0, "native", ""
+    for form_label, form_key, pattern in compiled.forms:
+        form_similarity = levenshtein_similarity(pattern, attempt)
+        if not key or form_similarity > similarity:
+            similarity, label, key = form_similarity, form_label, form_key
+
+    score = int(similarity * 100)
+
+    result = {
         "score": score,
         "similarity": round(similarity, 3),
-        "feedback": feedback
+        "feedback": feedback_for(score),
+        "word_errors": [op for op in align_words(key, attempt) if op["op"] != "match"],
+        "reference_text": compiled.native,
+        "transliteration": compiled.transliteration,
+        "compared_as": attempt,
+        "matched_form": label,
     }
+
+    if stt:
+        result.update(stt, score_ms=_ms(start, time.perf_counter()))
+    return result
@@ -0,0 +1,562 @@
+# services/stt_jobs.py
+"""
+Asynchronous speech-to-text jobs.
+
+Uploads are decoded in the web process, silence is dropped with a VAD
+pass and the speech is split at pauses into chunks of at most 30 s. Each
+chunk goes onto a bounded local queue consumed by a pool of dedicated
+worker processes (each with its own Whisper model), so one long recording
+is transcribed by several workers at once and no Flask request thread
+runs Whisper. A collector thread in the web process stitches the chunks
+back together with timestamps, records job status and per-job timings and
+(optionally) POSTs the result to a callback URL on an allowlisted host.
+It also watches the workers: a worker that dies fails the job it was
+running and is replaced.
+"""
+
+from typing import Any, Dict, Optional
+import ipaddress
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import threading
+import time
+import urllib.parse
+import urllib.request
+import uuid
+
+from utils.config_utils import env_int, env_str
+from utils.model_loader import LazyModel, READY
+from utils.audio_utils import SAMPLE_RATE, split_on_pauses
+from services.stt_service import DEFAULT_MODEL, AUTO_LANGUAGE, STT_WORKERS, stt_cache, stt_cache_key
+
+# Worker processes (STT_WORKERS; the Whisper RAM budget is shared with them),
+# torch threads per worker and queue bound (in <=30 s chunks)
+WORKERS = STT_WORKERS
+THREADS_PER_WORKER = env_int("STT_THREADS_PER_WORKER", 0) or max(1, (os.cpu_count() or 1) // WORKERS)
+QUEUE_SIZE = env_int("STT_QUEUE_SIZE", 32)
+
+# Finished jobs are kept this long for polling
+JOB_TTL_SECONDS = env_int("STT_JOB_TTL_SECONDS", 3600)
+
+# Synchronous /stt only accepts short clips and waits at most this long
+SYNC_MAX_SECONDS = env_int("STT_SYNC_MAX_SECONDS", 30)
+SYNC_TIMEOUT_SECONDS = env_int("STT_SYNC_TIMEOUT_SECONDS", 120)
+
+# Hosts that may receive job callbacks (comma separated). Empty: callbacks
+# are off. Allowed hosts must still resolve to public addresses only.
+CALLBACK_HOSTS = {h.strip().lower() for h in env_str("STT_CALLBACK_HOSTS", "").split(",") if h.strip()}
+
+# How often the collector checks for dead workers, and the least time
+# between two restarts of the same worker slot (avoids a crash loop)
+WORKER_CHECK_SECONDS = 1.0
+RESTART_BACKOFF_SECONDS = env_int("STT_WORKER_RESTART_BACKOFF_SECONDS", 10)
+
+# Chunk index of the language-ID task that precedes language="auto" jobs
+DETECT = -1
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueFullError(Exception):
+    """Raised when the STT job queue is at capacity."""
+
+
+class CallbackNotAllowedError(ValueError):
+    """Raised for a callback_url the server must not call."""
+
+
+# ============================================================
+# 1. WORKER PROCESS
+# ============================================================
+
+def _worker_main(tasks, results, threads: int):
+    """Worker loop: load and warm Whisper once, report ready, then transcribe jobs."""
+    try:
+        import torch
+        torch.set_num_threads(threads)
+
+        from services.stt_service import transcribe_segments, detect_language, registry
+        with registry.acquire():
+            pass  # load + warm the default model before reporting ready
+    except Exception as e:
+        results.put(("load_failed", None, {"error": str(e), "worker_pid": os.getpid()}))
+        return
+
+    results.put(("ready", None, {"worker_pid": os.getpid()}))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        job_id, index, samples, language, model = task
+        pid = os.getpid()
+        results.put(("started", (job_id, index), {"started_at": time.time(), "worker_pid": pid}))
+
+        start = time.perf_counter()
+        try:
+            if index == DETECT:
+                result = detect_language(samples, model)
+                results.put(("detected", (job_id, index), {**result, "worker_pid": pid}))
+                continue
+
+            result = transcribe_segments(samples, language, model)
+            result["transcribe_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            result["finished_at"] = time.time()
+            result["model_stats"] = registry.stats()
+            result["worker_pid"] = pid
+            results.put(("done", (job_id, index), result))
+        except Exception as e:
+            results.put(("failed", (job_id, index), {"error": str(e), "finished_at": time.time(), "worker_pid": pid}))
+
+
+# ============================================================
+# 2. JOB MANAGER (WEB PROCESS)
+# ============================================================
+
+class STTJobManager:
+    """Owns the worker processes, the bounded queue and the job table."""
+
+    def __init__(self, workers: int = WORKERS, queue_size: int = QUEUE_SIZE,
+                 threads_per_worker: int = THREADS_PER_WORKER):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.threads_per_worker = threads_per_worker
+
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._chunks: Dict[str, Dict[str, list]] = {}  # job_id -> chunk offsets + results
+        self._reserved = 0  # queue slots held for auto-language jobs awaiting detection
+        self._worker_models: Dict[int, Dict[str, Any]] = {}  # pid -> latest registry stats
+        self._in_flight: Dict[int, tuple] = {}  # pid -> (job_id, index) it is working on
+        self._lock = threading.Lock()
+        self._processes = []
+        self._spawned_at = []
+        self.restarts = 0
+
+        # Registered as a model so /ready and PRELOAD_MODELS cover the pool
+        self._pool = LazyModel("stt_workers", self._start)
+
+    # ---------- lifecycle ----------
+
+    def _start(self):
+        """Spawn the workers and block until each has loaded Whisper."""
+        self._ctx = multiprocessing.get_context("spawn")
+        self._tasks = self._ctx.Queue(maxsize=self.queue_size)
+        self._results = self._ctx.Queue()
+
+        self._processes = [self._spawn(i) for i in range(self.workers)]
+        self._spawned_at = [time.monotonic()] * self.workers
+
+        ready = 0
+        while ready < len(self._processes):
+            try:
+                kind, _, info = self._results.get(timeout=1)
+            except queue.Empty:
+                if any(p.exitcode is not None for p in self._processes):
+                    self._stop_workers()
+                    raise RuntimeError("STT worker exited during startup")
+                continue
+
+            if kind == "load_failed":
+                self._stop_workers()
+                raise RuntimeError(f"STT worker failed to load Whisper: {info['error']}")
+            ready += 1
+
+        threading.Thread(target=self._collect, name="stt-collector", daemon=True).start()
+        return self._processes
+
+    def _spawn(self, slot: int):
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(self._tasks, self._results, self.threads_per_worker),
+            name=f"stt-worker-{slot}",
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    def _stop_workers(self):
+        for p in self._processes:
+            p.terminate()
+        self._processes = []
+
+    def _collect(self):
+        """Apply worker status messages to the job table; replace dead workers."""
+        last_check = time.monotonic()
+        while True:
+            try:
+                message = self._results.get(timeout=WORKER_CHECK_SECONDS)
+            except queue.Empty:
+                message = None
+            except (OSError, EOFError, ValueError):
+                return  # queue closed: the process is shutting down
+
+            try:
+                if message is not None:
+                    self._apply(*message)
+
+                if time.monotonic() - last_check >= WORKER_CHECK_SECONDS:
+                    last_check = time.monotonic()
+                    self._check_workers()
+
+            except Exception as e:
+                # One bad message must not stop every later job from finishing
+                print(f"[WARN] STT collector error: {e!r}")
+
+    def _apply(self, kind: str, key, update: Dict[str, Any]):
+        """Apply one worker message to the job table."""
+        if kind == "ready":
+            return
+        if kind == "load_failed":
+            print(f"[WARN] Restarted STT worker {update.get('worker_pid')} failed to load Whisper: {update['error']}")
+            return
+
+        job_id, index = key
+        pid = update.pop("worker_pid", None)
+        with self._lock:
+            if kind == "started":
+                self._in_flight[pid] = key
+            else:
+                self._in_flight.pop(pid, None)
+
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] in (DONE, FAILED):
+                return
+
+            if kind == "started":
+                if job["status"] == QUEUED:
+                    job["status"] = RUNNING
+                    job["started_at"] = update["started_at"]
+                    job["queue_ms"] = round((job["started_at"] - job["submitted_at"]) * 1000, 1)
+                return
+
+            if kind == "detected":
+                job.update(update)
+                if self._queue_chunks(job):
+                    return  # the chunk results finish the job
+            elif kind == "failed":
+                job["error"] = update["error"]
+                self._finish(job, FAILED, update["finished_at"])
+            else:
+                self._worker_models[pid] = update.pop("model_stats")
+                parts = self._chunks[job_id]["parts"]
+                parts[index] = update
+                if any(p is None for p in parts):
+                    return
+                cache_key = self._chunks[job_id]["cache_key"]
+                job.update(self._stitch(job_id))
+                self._finish(job, DONE, max(p["finished_at"] for p in parts))
+
+            snapshot = dict(job)
+
+        if snapshot["status"] == DONE:
+            stt_cache.set(cache_key, {
+                k: snapshot[k]
+                for k in ("text", "segments", "speech_seconds", "language", "language_probability")
+                if k in snapshot
+            })
+
+        if snapshot.get("callback_url"):
+            _fire_callback(snapshot)
+
+    def _check_workers(self):
+        """Fail the job a dead worker was running and start a replacement."""
+        for slot, process in enumerate(self._processes):
+            if process.exitcode is None:
+                continue
+
+            snapshot = None
+            with self._lock:
+                task = self._in_flight.pop(process.pid, None)
+                self._worker_models.pop(process.pid, None)
+                job = self._jobs.get(task[0]) if task else None
+                if job is not None and job["status"] not in (DONE, FAILED):
+                    job["error"] = f"STT worker exited with code {process.exitcode}"
+                    self._finish(job, FAILED, time.time())
+                    snapshot = dict(job)
+
+            if snapshot is not None:
+                print(f"[WARN] STT worker {process.pid} died running job {snapshot['job_id']}")
+                if snapshot.get("callback_url"):
+                    _fire_callback(snapshot)
+
+            if time.monotonic() - self._spawned_at[slot] < RESTART_BACKOFF_SECONDS:
+                continue  # crashed right after starting: retry on a later check
+
+            print(f"[WARN] STT worker {process.pid} exited with code {process.exitcode}, restarting")
+            self._processes[slot] = self._spawn(slot)
+            self._spawned_at[slot] = time.monotonic()
+            self.restarts += 1
+
+    def _queue_chunks(self, job: Dict[str, Any]) -> bool:
+        """
+        Language is fixed now: hand the job's reserved slots back and fan
+        its chunks out. Never blocks the collector; if the chunks don't fit
+        after all, the job fails (caller holds the lock).
+        """
+        chunks = self._chunks[job["job_id"]]
+        self._reserved -= chunks.pop("reserved")
+        audio = chunks.pop("audio")
+        try:
+            for i, chunk in enumerate(audio):
+                self._tasks.put_nowait((job["job_id"], i, chunk, job["language"], job["model"]))
+        except queue.Full:
+            # Chunks already queued are ignored once the job has failed
+            job["error"] = f"STT queue is full ({self.queue_size} chunks)"
+            self._finish(job, FAILED, time.time())
+            return False
+        return True
+
+    def _stitch(self, job_id: str) -> Dict[str, Any]:
+        """Join chunk transcripts in order, shifting timestamps to the full recording."""
+        chunks = self._chunks[job_id]
+        texts, segments = [], []
+
+        for offset, part in zip(chunks["offsets"], chunks["parts"]):
+            base = offset / SAMPLE_RATE
+            if part["text"]:
+                texts.append(part["text"])
+            segments += [
+                {"start": round(base + seg["start"], 2), "end": round(base + seg["end"], 2), "text": seg["text"]}
+                for seg in part["segments"]
+            ]
+
+        return {
+            "text": " ".join(texts),
+            "segments": segments,
+            "transcribe_ms": round(sum(p["transcribe_ms"] for p in chunks["parts"]), 1),
+        }
+
+    def _finish(self, job: Dict[str, Any], status: str, finished_at: float):
+        """Mark a job finished (caller holds the lock)."""
+        job["status"] = status
+        job["finished_at"] = finished_at
+        job["total_ms"] = round((finished_at - job["submitted_at"]) * 1000, 1)
+        self._drop_chunks(job["job_id"])
+
+    def _drop_chunks(self, job_id: str):
+        """Forget a job's chunk state and release its reserved slots (caller holds the lock)."""
+        chunks = self._chunks.pop(job_id, None)
+        if chunks:
+            self._reserved -= chunks.get("reserved", 0)
+
+    # ---------- public API ----------
+
+    def submit(self, samples, language: str = "en", model: Optional[str] = None,
+               callback_url: Optional[str] = None) -> str:
+        """
+        Queue decoded 16 kHz samples; returns the job id.
+        Audio transcribed before (same PCM, language and model) finishes
+        immediately from the cache.
+        Raises QueueFullError if the job's chunks don't fit in the queue,
+        CallbackNotAllowedError for a callback_url the server won't call.
+        """
+        if callback_url:
+            check_callback_url(callback_url)
+
+        self._prune()
+
+        model = model or DEFAULT_MODEL
+        cache_key = stt_cache_key(samples, language, model)
+        cached = stt_cache.get(cache_key)
+
+        chunks = []
+        if cached is None:
+            self._pool.get()
+            chunks = split_on_pauses(samples)
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": QUEUED,
+            "language": language,
+            "model": model,
+            "audio_seconds": round(len(samples) / SAMPLE_RATE, 2),
+            "speech_seconds": round(sum(b - a for a, b in chunks) / SAMPLE_RATE, 2),
+            "chunks": len(chunks),
+            "cached": cached is not None,
+            "submitted_at": time.time(),
+            "callback_url": callback_url,
+        }
+
+        tasks = [(job_id, index, samples[a:b], language, model) for index, (a, b) in enumerate(chunks)]
+
+        with self._lock:
+            # Auto-language jobs queue one detect task now and hold slots for
+            # their chunks until the collector queues them
+            needed = len(chunks) + (language == AUTO_LANGUAGE)
+            if needed > self.queue_size - self._queue_depth():
+                raise QueueFullError(f"STT queue is full ({self.queue_size} chunks)")
+
+            self._jobs[job_id] = job
+            if cached is not None:
+                job.update(cached)
+                job["transcribe_ms"] = 0.0
+                self._finish(job, DONE, time.time())
+            elif not chunks:
+                # Nothing but silence
+                job.update({"text": "", "segments": [], "transcribe_ms": 0.0})
+                self._finish(job, DONE, job["submitted_at"])
+            else:
+                self._chunks[job_id] = {
+                    "offsets": [a for a, _ in chunks],
+                    "parts": [None] * len(chunks),
+                    "cache_key": cache_key,
+                }
+                if language == AUTO_LANGUAGE:
+                    # Detect once on the first chunk (<= 30 s of speech); the
+                    # collector queues the chunks when the language is known
+                    self._chunks[job_id].update({"audio": [t[2] for t in tasks], "reserved": len(tasks)})
+                    self._reserved += len(tasks)
+                    tasks = [(job_id, DETECT, tasks[0][2], language, model)]
+
+        if not chunks:
+            if callback_url:
+                _fire_callback(dict(job))
+            return job_id
+
+        try:
+            for task in tasks:
+                self._tasks.put_nowait(task)
+        except queue.Full:
+            # qsize() lags puts from other processes; chunks already queued are ignored
+            with self._lock:
+                del self._jobs[job_id]
+                self._drop_chunks(job_id)
+            raise QueueFullError(f"STT queue is full ({self.queue_size} chunks)")
+
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait(self, job_id: str, timeout: float = None, poll: float = 0.05) -> Optional[Dict[str, Any]]:
+        """Block until the job finishes (or timeout); returns its record."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] in (DONE, FAILED):
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(poll)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            records = list(self._jobs.values())
+            queue_depth = self._queue_depth()
+
+        counts = {s: sum(1 for j in records if j["status"] == s) for s in (QUEUED, RUNNING, DONE, FAILED)}
+        done = [j for j in records if j["status"] == DONE]
+
+        return {
+            "workers": self.workers,
+            "workers_alive": sum(1 for p in self._processes if p.is_alive()),
+            "worker_restarts": self.restarts,
+            "queue_size": self.queue_size,
+            "queue_depth": queue_depth,
+            "jobs": counts,
+            "avg_queue_ms": _mean(j.get("queue_ms") for j in done),
+            "avg_transcribe_ms": _mean(j.get("transcribe_ms") for j in done),
+        }
+
+    def model_stats(self) -> Dict[int, Dict[str, Any]]:
+        """Whisper registry stats last reported by each worker process, by pid."""
+        with self._lock:
+            return dict(self._worker_models)
+
+    # ---------- helpers ----------
+
+    def _queue_depth(self) -> int:
+        """Queued tasks plus slots reserved for pending chunks (caller holds the lock)."""
+        if self._pool.state != READY:
+            return 0
+        try:
+            return self._tasks.qsize() + self._reserved
+        except NotImplementedError:  # macOS: unfinished chunks (reserved ones included)
+            return sum(
+                sum(1 for p in c["parts"] if p is None) for c in self._chunks.values()
+            )
+
+    def _prune(self):
+        """Forget finished jobs older than JOB_TTL_SECONDS."""
+        cutoff = time.time() - JOB_TTL_SECONDS
+        with self._lock:
+            expired = [
+                job_id for job_id, j in self._jobs.items()
+                if j["status"] in (DONE, FAILED) and j.get("finished_at", 0) < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+
+def _mean(values) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return round(sum(values) / len(values), 1) if values else None
+
+
+def check_callback_url(url: str):
+    """
+    Raise CallbackNotAllowedError unless `url` is http(s) on a host in
+    STT_CALLBACK_HOSTS that resolves only to public (non-private,
+    non-loopback, non-link-local) addresses.
+    """
+    if not CALLBACK_HOSTS:
+        raise CallbackNotAllowedError("Job callbacks are disabled on this server")
+
+    parts = urllib.parse.urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in ("http", "https") or not host:
+        raise CallbackNotAllowedError(f"Invalid callback_url: {url}")
+    if host not in CALLBACK_HOSTS:
+        raise CallbackNotAllowedError(f"Callback host not allowed: {host}")
+
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        infos = socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
+    except (OSError, ValueError) as e:
+        raise CallbackNotAllowedError(f"Callback host does not resolve: {host} ({e})")
+
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if getattr(address, "ipv4_mapped", None):
+            address = address.ipv4_mapped
+        if not address.is_global:
+            raise CallbackNotAllowedError(f"Callback host resolves to a non-public address: {host}")
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """A redirect could point the callback anywhere: treat it as a failure."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_callback_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def _fire_callback(job: Dict[str, Any]):
+    threading.Thread(target=_post_callback, args=(job["callback_url"], job), daemon=True).start()
+
+
+def _post_callback(url: str, job: Dict[str, Any]):
+    """POST the finished job as JSON to the client's callback URL."""
+    body = json.dumps(job, ensure_ascii=False).encode("utf-8")
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    try:
+        check_callback_url(url)     # again: DNS may have changed since submit
+        _callback_opener.open(req, timeout=10).close()
+    except Exception as e:
+        print(f"[WARN] STT callback to {url} failed: {e}")
+
+
+# Shared manager, workers start on the first job (or at startup when preloading)
+jobs = STTJobManager()
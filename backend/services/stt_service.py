@@ -1,26 +1,321 @@
 # services/stt_service.py
+"""
+Whisper models by size ("tiny" for live practice, "small" for accurate
+batch work, ...), loaded on demand and kept under a RAM budget: before a
+model is loaded, idle models are evicted least-recently-used first until
+it fits. Each model has its own lock (Whisper's decoder installs kv-cache
+hooks per call, so one call at a time per model) and its own load time,
+resident size and latency counters.
 
-import whisper
-import tempfile
-import os
+Finished transcripts are cached by a hash of the decoded PCM, so replayed
+or retried recordings skip Whisper entirely.
 
-# Load model once
-model = whisper.load_model("base")
+language="auto" runs Whisper's language ID once on the first 30 s mel
+window, restricted to the app's LANGUAGES, then transcribes with that
+language fixed.
+"""
 
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import threading
+import time
 
-def speech_to_text(audio_file, language="en"):
+from utils.config_utils import env_int, env_str
+from utils.cache_utils import TwoTierCache, SqliteStore
+from utils.model_loader import LazyModel, LOADING, READY
+from utils.audio_utils import decode_audio_bytes, trim_silence, SAMPLE_RATE
+from utils.module2_utils import LANGUAGES
+
+# Pass language="auto" to detect the spoken language first
+AUTO_LANGUAGE = "auto"
+
+# Approximate fp32 footprint (MB), used to budget a model before it is loaded
+WHISPER_SIZES_MB = {
+    "tiny": 150, "tiny.en": 150,
+    "base": 290, "base.en": 290,
+    "small": 970, "small.en": 970,
+    "medium": 3060, "medium.en": 3060,
+    "large": 6170, "large-v1": 6170, "large-v2": 6170, "large-v3": 6170,
+    "large-v3-turbo": 3240, "turbo": 3240,
+}
+
+# Sizes missing from the table are budgeted as the largest model
+UNKNOWN_SIZE_MB = max(WHISPER_SIZES_MB.values())
+
+
+def whisper_size_mb(size: str) -> int:
+    """Estimated footprint of a Whisper size (before it is loaded)."""
+    return WHISPER_SIZES_MB.get(size, UNKNOWN_SIZE_MB)
+
+
+DEFAULT_MODEL = env_str("STT_MODEL", "base")
+
+# Whisper size used for live streaming sessions (services/stt_stream.py)
+STREAM_MODEL = env_str("STT_STREAM_MODEL", DEFAULT_MODEL)
+
+AVAILABLE_MODELS = [m.strip() for m in env_str("STT_MODELS", "tiny,base,small").split(",") if m.strip()]
+for _size in (DEFAULT_MODEL, STREAM_MODEL):
+    if _size not in AVAILABLE_MODELS:
+        AVAILABLE_MODELS.append(_size)
+
+for _size in AVAILABLE_MODELS:
+    if _size not in WHISPER_SIZES_MB:
+        print(f"[WARN] No size estimate for Whisper '{_size}'; budgeting it as {UNKNOWN_SIZE_MB} MB")
+
+# RAM budget for Whisper models across the whole deployment. Every process
+# that holds models has its own registry (the web process for streaming and
+# /score, plus each STT job worker), so each registry gets an equal share.
+RAM_BUDGET_MB = env_int("STT_MODEL_RAM_BUDGET_MB", 4096)
+STT_WORKERS = max(1, env_int("STT_WORKERS", 2))
+STT_PROCESSES = STT_WORKERS + 1
+PROCESS_BUDGET_MB = RAM_BUDGET_MB // STT_PROCESSES
+
+# Transcript cache keyed by audio content: in-memory LRU, plus a SQLite
+# file when STT_CACHE_PATH is set (e.g. data/cache/stt.sqlite3)
+CACHE_SIZE = env_int("STT_CACHE_SIZE", 512)
+CACHE_PATH = env_str("STT_CACHE_PATH", "")
+
+
+def _load_whisper(size: str):
+    """Load one Whisper size (the whisper/torch import is deferred until needed)."""
+    import whisper
+    return whisper.load_model(size)
+
+
+def _warmup_whisper(model):
+    """Transcribe one second of silence to trigger allocations up front."""
+    import numpy as np
+    model.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32), language="en")
+
+
+def _resident_mb(model) -> Optional[float]:
+    """Bytes held by the model's parameters and buffers, in MB."""
+    try:
+        tensors = list(model.parameters()) + list(model.buffers())
+        return round(sum(t.numel() * t.element_size() for t in tensors) / (1024 * 1024), 1)
+    except Exception:
+        return None
+
+
+# ============================================================
+# 1. MODEL REGISTRY
+# ============================================================
+
+class _WhisperEntry:
+    def __init__(self, size: str):
+        self.size = size
+        self.handle = LazyModel(f"whisper-{size}", lambda: _load_whisper(size), warmup=_warmup_whisper)
+        self.lock = threading.Lock()        # one transcribe at a time
+        self.in_use = 0
+        self.last_used = 0.0
+        self.resident_mb: Optional[float] = None
+        self.inferences = 0
+        self.inference_ms_total = 0.0
+        self.last_inference_ms: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.handle.state == READY
+
+    @property
+    def committed(self) -> bool:
+        """Loaded, loading, or held by a caller about to load it: counts against the budget."""
+        return self.handle.state in (READY, LOADING) or self.in_use > 0
+
+    @property
+    def budget_mb(self) -> float:
+        return self.resident_mb or whisper_size_mb(self.size)
+
+
+class WhisperRegistry:
+    """Loads Whisper sizes on demand and evicts idle ones to stay within this process's budget."""
+
+    def __init__(self, sizes=None, budget_mb: int = PROCESS_BUDGET_MB):
+        self.budget_mb = budget_mb
+        self.evictions = 0
+        self._entries = {size: _WhisperEntry(size) for size in (sizes or AVAILABLE_MODELS)}
+        self._lock = threading.Lock()
+
+    def __contains__(self, size: str) -> bool:
+        return size in self._entries
+
+    @contextmanager
+    def acquire(self, size: str = None):
+        """Yield (entry, model) for `size`, loading (and evicting) as needed."""
+        entry = self._entries[size or DEFAULT_MODEL]
+
+        with self._lock:
+            entry.in_use += 1
+            if not entry.loaded:
+                self._make_room(entry)
+
+        try:
+            model = entry.handle.get()
+            if entry.resident_mb is None:
+                entry.resident_mb = _resident_mb(model)
+            yield entry, model
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.time()
+
+    def _make_room(self, incoming: _WhisperEntry):
+        """Evict idle loaded models (LRU first) until `incoming` fits (caller holds the lock)."""
+        # Models still loading (or about to, for another caller) use memory too
+        committed = [e for e in self._entries.values() if e.committed and e is not incoming]
+        used = sum(e.budget_mb for e in committed)
+
+        for entry in sorted(committed, key=lambda e: e.last_used):
+            if used + incoming.budget_mb <= self.budget_mb:
+                break
+            if entry.in_use or not entry.loaded:
+                continue
+            entry.handle.unload()
+            used -= entry.budget_mb
+            self.evictions += 1
+            print(f"[INFO] Evicted Whisper '{entry.size}' to load '{incoming.size}'")
+
+        if used + incoming.budget_mb > self.budget_mb:
+            print(f"[WARN] Loading Whisper '{incoming.size}' puts STT models over the "
+                  f"{self.budget_mb} MB budget ({used + incoming.budget_mb:.0f} MB)")
+
+    def record(self, entry: _WhisperEntry, elapsed_ms: float):
+        with self._lock:
+            entry.inferences += 1
+            entry.inference_ms_total += elapsed_ms
+            entry.last_inference_ms = round(elapsed_ms, 1)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = {
+                e.size: {
+                    **e.handle.status(),
+                    "resident_mb": e.resident_mb if e.loaded else None,
+                    "estimated_mb": whisper_size_mb(e.size),
+                    "in_use": e.in_use,
+                    "inferences": e.inferences,
+                    "avg_inference_ms": round(e.inference_ms_total / e.inferences, 1) if e.inferences else None,
+                    "last_inference_ms": e.last_inference_ms,
+                }
+                for e in self._entries.values()
+            }
+            loaded_mb = sum(e.budget_mb for e in self._entries.values() if e.committed)
+
+        return {
+            "default": DEFAULT_MODEL,
+            "budget_mb": self.budget_mb,
+            "deployment_budget_mb": RAM_BUDGET_MB,
+            "processes": STT_PROCESSES,
+            "loaded_mb": round(loaded_mb, 1),
+            "evictions": self.evictions,
+            "models": models,
+        }
+
+
+registry = WhisperRegistry()
+
+
+# ============================================================
+# 2. RESULT CACHE
+# ============================================================
+
+stt_cache = TwoTierCache(
+    max_entries=CACHE_SIZE,
+    store=SqliteStore(Path(CACHE_PATH), table="transcripts") if CACHE_PATH else None,
+)
+
+
+def stt_cache_key(samples, language: str, model: str = None) -> str:
+    """Content hash of the decoded 16 kHz PCM + everything that changes the transcript."""
+    digest = hashlib.sha256(samples.astype("<f4", copy=False).tobytes()).hexdigest()
+    return f"{digest}:{language}:{model or DEFAULT_MODEL}"
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Hit/miss/eviction counters for the transcript cache."""
+    return stt_cache.stats()
+
+
+# ============================================================
+# 3. TRANSCRIPTION
+# ============================================================
+
+def detect_language(samples, model=None) -> dict:
     """
-    Convert uploaded audio file into text using Whisper.
+    Whisper language ID on the first 30 s window only, choosing among the
+    app's LANGUAGES. Returns { "language": "hi", "language_probability": 0.93, "detect_ms": 41.2 }
     """
-    # Save to temp file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-        audio_file.save(tmp.name)
-        temp_path = tmp.name
+    import whisper
 
-    try:
-        result = model.transcribe(temp_path, language=language)
-        text = result.get("text", "").strip()
-        return text
+    with registry.acquire(model) as (entry, whisper_model):
+        with entry.lock:
+            start = time.perf_counter()
+            audio = whisper.pad_or_trim(samples)
+            mel = whisper.log_mel_spectrogram(audio, getattr(whisper_model.dims, "n_mels", 80))
+            _, probs = whisper_model.detect_language(mel.to(whisper_model.device))
+            detect_ms = round((time.perf_counter() - start) * 1000, 1)
 
-    finally:
-        os.remove(temp_path)
+    candidates = {lang: probs.get(lang, 0.0) for lang in LANGUAGES}
+    language = max(candidates, key=candidates.get)
+    return {
+        "language": language,
+        "language_probability": round(float(candidates[language]), 4),
+        "detect_ms": detect_ms,
+    }
+
+
+def transcribe_segments(samples, language="en", model=None) -> dict:
+    """
+    Transcribe 16 kHz mono float32 samples, keeping Whisper's timestamps.
+    `model` is a Whisper size from AVAILABLE_MODELS (default: STT_MODEL).
+    Returns { "text": "...", "segments": [{"start": 0.0, "end": 2.4, "text": "..."}] }
+
+    With language="auto" the detected language, its probability and
+    detect_ms are added to the result.
+    """
+    detected = {}
+    if language == AUTO_LANGUAGE:
+        detected = detect_language(samples, model)
+        language = detected["language"]
+
+    with registry.acquire(model) as (entry, whisper_model):
+        with entry.lock:
+            start = time.perf_counter()
+            result = whisper_model.transcribe(samples, language=language)
+            registry.record(entry, (time.perf_counter() - start) * 1000)
+
+    segments = [
+        {"start": round(s["start"], 2), "end": round(s["end"], 2), "text": s["text"].strip()}
+        for s in result.get("segments", [])
+    ]
+    return {"text": result.get("text", "").strip(), "segments": segments, **detected}
+
+
+def transcribe_cached(samples, language="en", model=None) -> Tuple[dict, bool]:
+    """
+    transcribe_segments() behind the STT cache, with leading and trailing
+    silence trimmed first. Returns (result, served_from_cache).
+    """
+    key = stt_cache_key(samples, language, model)
+    cached = stt_cache.get(key)
+    if cached is not None:
+        return cached, True
+
+    speech = trim_silence(samples)
+    result = transcribe_segments(speech, language, model) if len(speech) else {"text": "", "segments": []}
+    stt_cache.set(key, result)
+    return result, False
+
+
+def speech_to_text(audio_file, language="en", model=None):
+    """
+    Convert uploaded audio file into text using Whisper.
+    The upload is decoded in memory and handed to Whisper as an array,
+    so no temp file is written on this path. Leading and trailing silence
+    is trimmed first, and repeat audio is answered from the cache.
+    """
+    samples = decode_audio_bytes(audio_file.read())
+    result, _ = transcribe_cached(samples, language, model)
+    return result["text"]
@@ -0,0 +1,186 @@
+# services/stt_stream.py
+"""
+Streaming speech-to-text sessions.
+
+A client opens a session, then posts raw PCM (16 kHz, mono, s16le) as it
+is captured. Audio accumulates in a rolling buffer; whenever enough new
+audio has arrived (or the buffer reaches STREAM_WINDOW_SECONDS), Whisper
+re-runs on the whole uncommitted buffer and the partial transcript is
+returned. Once the buffer fills the window, segments that ended well
+before the live edge are committed and their audio is dropped, so each
+re-run stays bounded (window + one chunk) no matter how long the
+learner speaks. Ending the session decodes what is left and returns the
+final transcript.
+
+Uses the in-process Whisper handle from stt_service (short windows, low
+latency) rather than the job worker pool.
+"""
+
+from typing import Any, Dict, Optional
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from utils.config_utils import env_float, env_int
+from utils.audio_utils import SAMPLE_RATE
+from services.stt_service import transcribe_segments, STREAM_MODEL
+
+# Rolling window Whisper sees on each re-run
+WINDOW_SECONDS = env_float("STT_STREAM_WINDOW_SECONDS", 10.0)
+
+# Re-run only once this much new audio has arrived since the last decode
+MIN_NEW_SECONDS = env_float("STT_STREAM_MIN_NEW_SECONDS", 1.0)
+
+# With language="auto", detection re-runs on each decode until this much
+# audio has arrived, then the detected language is kept for the session
+DETECT_SECONDS = env_float("STT_STREAM_DETECT_SECONDS", 3.0)
+
+# Idle sessions are dropped after this long; cap on concurrent sessions
+SESSION_TTL_SECONDS = env_int("STT_STREAM_SESSION_TTL_SECONDS", 60)
+MAX_SESSIONS = env_int("STT_STREAM_MAX_SESSIONS", 16)
+
+
+class TooManySessionsError(Exception):
+    """Raised when MAX_SESSIONS streaming sessions are already open."""
+
+
+# ============================================================
+# 1. SESSION
+# ============================================================
+
+class STTStreamSession:
+    """Rolling audio buffer + committed transcript for one speaker."""
+
+    def __init__(self, language: str = "en", model: Optional[str] = None):
+        self.session_id = uuid.uuid4().hex
+        self.language = language
+        self.model = model or STREAM_MODEL
+        self.detected = {}              # language ID result when language="auto"
+
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.committed = []             # finalized segment texts
+        self.pending = ""               # transcript of the live window
+        self.received_seconds = 0.0
+        self.decoded_at = 0.0           # received_seconds at the last decode
+
+        self.created_at = time.time()
+        self.last_seen = self.created_at
+        self.decodes = 0
+        self.lock = threading.Lock()
+
+    def append(self, pcm: bytes) -> Dict[str, Any]:
+        """Add s16le PCM; re-decode the window if enough new audio arrived."""
+        samples = np.frombuffer(pcm[: len(pcm) // 2 * 2], dtype="<i2").astype(np.float32) / 32768.0
+        self.buffer = np.concatenate((self.buffer, samples))
+        self.received_seconds += len(samples) / SAMPLE_RATE
+        self.last_seen = time.time()
+
+        # Decode at the latest when the buffer fills the window: audio is only
+        # dropped after a decode has committed it, so it must never pile up
+        # past the window between decodes
+        decode_ms = None
+        window = int(WINDOW_SECONDS * SAMPLE_RATE)
+        if self.received_seconds - self.decoded_at >= MIN_NEW_SECONDS or len(self.buffer) >= window:
+            decode_ms = self._decode(final=False)
+
+        return self._result(final=False, decode_ms=decode_ms)
+
+    def finish(self) -> Dict[str, Any]:
+        """Decode whatever is left and return the final transcript."""
+        decode_ms = self._decode(final=True) if len(self.buffer) else None
+        return self._result(final=True, decode_ms=decode_ms)
+
+    # ---------- internals ----------
+
+    def _decode(self, final: bool) -> float:
+        window = int(WINDOW_SECONDS * SAMPLE_RATE)
+
+        start = time.perf_counter()
+        result = transcribe_segments(self.buffer, self.language, self.model)
+        decode_ms = round((time.perf_counter() - start) * 1000, 1)
+
+        if "language_probability" in result:
+            self.detected = {k: result[k] for k in ("language", "language_probability", "detect_ms")}
+            if self.received_seconds >= DETECT_SECONDS:
+                self.language = result["language"]
+
+        self.decodes += 1
+        self.decoded_at = self.received_seconds
+
+        if final:
+            self.committed.append(result["text"])
+            self.pending = ""
+            self.buffer = self.buffer[:0]
+            return decode_ms
+
+        self.pending = result["text"]
+
+        # Window full: commit segments that ended in its first half and
+        # drop their audio, so the next re-run starts after them
+        if len(self.buffer) >= window:
+            cut = WINDOW_SECONDS / 2
+            done = [s for s in result["segments"] if s["end"] <= cut]
+            if done:
+                keep_from = int(done[-1]["end"] * SAMPLE_RATE)
+                self.committed += [s["text"] for s in done]
+                self.pending = " ".join(s["text"] for s in result["segments"][len(done):])
+            else:
+                # No segment boundary in the first half: commit the whole buffer
+                keep_from = len(self.buffer)
+                self.committed.append(result["text"])
+                self.pending = ""
+            self.buffer = self.buffer[keep_from:]
+
+        return decode_ms
+
+    def _result(self, final: bool, decode_ms: Optional[float]) -> Dict[str, Any]:
+        stable = " ".join(t for t in self.committed if t)
+        return {
+            "session_id": self.session_id,
+            "final": final,
+            "text": " ".join(t for t in (stable, self.pending) if t),
+            "stable_text": stable,
+            "updated": decode_ms is not None,
+            "decode_ms": decode_ms,
+            "audio_seconds": round(self.received_seconds, 2),
+            "decodes": self.decodes,
+            "language": self.detected.get("language", self.language),
+            **{k: v for k, v in self.detected.items() if k != "language"},
+        }
+
+
+# ============================================================
+# 2. SESSION TABLE
+# ============================================================
+
+_sessions: Dict[str, STTStreamSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def _prune_sessions():
+    cutoff = time.time() - SESSION_TTL_SECONDS
+    with _sessions_lock:
+        for session_id in [s for s, sess in _sessions.items() if sess.last_seen < cutoff]:
+            del _sessions[session_id]
+
+
+def open_session(language: str = "en", model: Optional[str] = None) -> STTStreamSession:
+    _prune_sessions()
+    with _sessions_lock:
+        if len(_sessions) >= MAX_SESSIONS:
+            raise TooManySessionsError(f"Too many open STT streams ({MAX_SESSIONS})")
+        session = STTStreamSession(language, model)
+        _sessions[session.session_id] = session
+    return session
+
+
+def get_session(session_id: str) -> Optional[STTStreamSession]:
+    with _sessions_lock:
+        return _sessions.get(session_id)
+
+
+def close_session(session_id: str) -> Optional[STTStreamSession]:
+    with _sessions_lock:
+        return _sessions.pop(session_id, None)
@@ -1,63 +1,388 @@
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+import json
+import threading
+import queue
+import time
 
-# NLLB model
-model_name = "facebook/nllb-200-distilled-600M"
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+from utils.config_utils import env_int, env_float, env_str, env_bool
+from utils.cache_utils import TwoTierCache, SqliteStore
+from utils.module2_utils import normalize_text
+from services import phrase_lookup
+from services.translation_engine import (
+    translate_batch,
+    translate_multi_target,
+    stream_translation,
+    model_name,
+    PRECISION,
+    GENERATION_PROFILES,
+    DEFAULT_PROFILE,
+    LANG_MAP,
+    WORKERS
+)
 
-# Map simple language codes to NLLB language tags
-LANG_MAP = {
-    "en": "eng_Latn",
-    "hi": "hin_Deva",
-    "ta": "tam_Taml",
-    "te": "tel_Telu",
-    "bn": "ben_Beng",
-    "mr": "mar_Deva",
-    "gu": "guj_Gujr",
-    "pa": "pan_Guru",
-}
+# Micro-batching settings (TRANSLATE_MAX_BATCH_SIZE=1 disables batching)
+MAX_BATCH_SIZE = env_int("TRANSLATE_MAX_BATCH_SIZE", 8)
+MAX_WAIT_MS = env_float("TRANSLATE_MAX_WAIT_MS", 10.0)
 
+# Translation cache: in-memory LRU in front of a SQLite file at
+# TRANSLATE_CACHE_PATH (set TRANSLATE_CACHE_DISK=false to keep it memory-only)
+CACHE_SIZE = env_int("TRANSLATE_CACHE_SIZE", 2048)
+CACHE_DISK = env_bool("TRANSLATE_CACHE_DISK", True)
+CACHE_PATH = env_str("TRANSLATE_CACHE_PATH", "data/cache/translations.sqlite3")
 
-def _get_lang_id(lang_code: str) -> int:
+
+def _translate_batch(texts: List[str], source: str, target: str,
+                     profile: str = DEFAULT_PROFILE) -> List[Tuple[str, int]]:
+    """Translate a batch on the engine: (translation, generated tokens) per text."""
+    return translate_batch(texts, source, target, profile)
+
+
+# ============================================================
+# MICRO-BATCHING SCHEDULER
+# ============================================================
+
+class _PendingTranslation:
+    """One queued request waiting for its batch to run."""
+
+    __slots__ = ("text", "key", "future")
+
+    def __init__(self, text: str, source: str, target: str, profile: str):
+        self.text = text
+        self.key = (source, target, profile)
+        self.future = Future()
+
+
+class TranslationBatcher:
+    """
+    Collects concurrent translation requests for up to `max_wait_ms`,
+    groups them by (source, target, profile) and runs each group as one batch.
+
+    Requests are resolved through a `Future`, so callers simply block on
+    `submit(...).result()` while the background thread does the work.
+    Up to `max_in_flight` batches run at once (one per engine worker);
+    while all of them are busy new requests keep queueing, so batches grow
+    under load instead of piling up.
+    """
+
+    def __init__(self, run_batch, max_batch_size: int = MAX_BATCH_SIZE,
+                 max_wait_ms: float = MAX_WAIT_MS, max_in_flight: int = WORKERS):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_in_flight = max(1, max_in_flight)
+
+        self._queue: "queue.Queue[_PendingTranslation]" = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._slots = threading.Semaphore(self.max_in_flight)
+        self._executor = ThreadPoolExecutor(self.max_in_flight, thread_name_prefix="translate-batch")
+
+    def submit(self, text: str, source: str, target: str,
+               profile: str = DEFAULT_PROFILE) -> Future:
+        """Queue a text for translation and return its Future."""
+        self._ensure_started()
+        item = _PendingTranslation(text, source, target, profile)
+        self._queue.put(item)
+        return item.future
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name="translate-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def _collect(self):
+        """Block for the first request, then gather more until the window closes."""
+        first = self._queue.get()
+        groups = {first.key: [first]}
+        deadline = time.monotonic() + self.max_wait
+
+        while max(len(g) for g in groups.values()) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            groups.setdefault(item.key, []).append(item)
+
+        return groups
+
+    def _run_group(self, key, items: List[_PendingTranslation]):
+        try:
+            results = self.run_batch([i.text for i in items], *key)
+        except Exception as e:
+            for item in items:
+                item.future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        for item, result in zip(items, results):
+            item.future.set_result(result)
+
+    def _loop(self):
+        while True:
+            groups = self._collect()
+            for key, items in groups.items():
+                self._slots.acquire()
+                self._executor.submit(self._run_group, key, items)
+
+
+_batcher = TranslationBatcher(_translate_batch)
+
+
+# ============================================================
+# TRANSLATION CACHE
+# ============================================================
+
+_cache = TwoTierCache(
+    max_entries=CACHE_SIZE,
+    store=SqliteStore(Path(CACHE_PATH), table="translations") if CACHE_DISK else None,
+)
+
+
+def _cache_key(text: str, source: str, target: str, profile: str = DEFAULT_PROFILE) -> str:
+    """Key on everything that changes the output of the model."""
+    return json.dumps(
+        [normalize_text(text), source, target, model_name, PRECISION,
+         profile, GENERATION_PROFILES[profile]],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+
+
+def _cacheable(profile: str) -> bool:
+    """Time-capped decoding can stop early, so its output is not reused."""
+    return "max_time" not in GENERATION_PROFILES[profile]["generate"]
+
+
+def get_cache_stats() -> Dict:
+    """Hit/miss/eviction counters for both cache tiers."""
+    return _cache.stats()
+
+
+def _result(translated: str, served_by: str, profile: str, tokens: int = 0) -> Dict:
+    return {
+        "translated_text": translated,
+        "served_by": served_by,
+        "profile": profile,
+        "generated_tokens": tokens,
+    }
+
+
+def translate_with_info(text: str, source: str, target: str,
+                        profile: str = DEFAULT_PROFILE) -> Dict:
+    """
+    Translate a single text and report which path served it:
+        "rule"        – override rule table
+        "phrase_bank" – human-verified phrase bank translation
+        "cache"       – translation cache
+        "model"       – NLLB (misses are merged with concurrent callers
+                        into padded batches by the micro-batching scheduler)
+
+    Returns:
+    { "translated_text": str, "served_by": str, "profile": str, "generated_tokens": int }
+    """
+    translated, served_by = phrase_lookup.lookup(text, source, target)
+    if translated is not None:
+        return _result(translated, served_by, profile)
+
+    key = _cache_key(text, source, target, profile)
+    cached = _cache.get(key)
+    if cached is not None:
+        return _result(cached, "cache", profile)
+
+    if MAX_BATCH_SIZE <= 1:
+        translated, tokens = _translate_batch([text], source, target, profile)[0]
+    else:
+        translated, tokens = _batcher.submit(text, source, target, profile).result()
+
+    if _cacheable(profile):
+        _cache.set(key, translated)
+    return _result(translated, "model", profile, tokens)
+
+
+def translate_text(text: str, source: str, target: str, profile: str = DEFAULT_PROFILE) -> str:
+    """Translate a single text (see translate_with_info for the lookup order)."""
+    return translate_with_info(text, source, target, profile)["translated_text"]
+
+
+# ============================================================
+# MULTI-TARGET
+# ============================================================
+
+def translate_multi(text: str, source: str, targets: List[str],
+                    profile: str = DEFAULT_PROFILE) -> Dict:
     """
-    Get the token id for a language code like 'hin_Deva' without relying on
-    tokenizer.lang_code_to_id (which is missing in older transformers).
+    Translate one text into several target languages.
+    Each target goes through the fast path and cache first; the remaining
+    targets share one encoder pass and are decoded together as one batch.
+
+    Returns:
+    {
+        "translations": {"hi": "...", "ta": "..."},
+        "served_by": {"hi": "phrase_bank", "ta": "model"},
+        "profile": "fast",
+        "generated_tokens": 42
+    }
     """
-    # If your tokenizer DOES have lang_code_to_id, use it
-    if hasattr(tokenizer, "lang_code_to_id"):
-        return tokenizer.lang_code_to_id[lang_code]
+    translations: Dict[str, str] = {}
+    paths: Dict[str, str] = {}
+    missing = []
 
-    # Fallback: convert the language code token to id directly
-    return tokenizer.convert_tokens_to_ids(lang_code)
+    for target in targets:
+        translated, served_by = phrase_lookup.lookup(text, source, target)
+        if translated is None:
+            translated, served_by = _cache.get(_cache_key(text, source, target, profile)), "cache"
+        if translated is None:
+            missing.append(target)
+            continue
+        translations[target], paths[target] = translated, served_by
 
+    tokens = 0
+    if missing:
+        for target, (translated, count) in zip(missing, translate_multi_target(text, source, missing, profile)):
+            if _cacheable(profile):
+                _cache.set(_cache_key(text, source, target, profile), translated)
+            translations[target], paths[target] = translated, "model"
+            tokens += count
 
-def translate_text(text: str, source: str, target: str) -> str:
-    # Resolve language tags, with safe defaults
-    src = LANG_MAP.get(source, "eng_Latn")
-    tgt = LANG_MAP.get(target, "hin_Deva")
+    return {
+        "translations": {t: translations[t] for t in targets},
+        "served_by": {t: paths[t] for t in targets},
+        "profile": profile,
+        "generated_tokens": tokens,
+    }
 
-    # Tell tokenizer what the source language is
-    tokenizer.src_lang = src
 
-    # Tokenize
-    inputs = tokenizer(text, return_tensors="pt")
+# ============================================================
+# LONG TEXT (SENTENCE SEGMENTED)
+# ============================================================
+
+def _submit_segments(sentences: List[str], source: str, target: str, profile: str) -> List:
+    """
+    Resolve each sentence through the fast path / cache and queue the rest
+    on the batcher in one go, so they run as padded batches.
+    Returns, per sentence, either a finished result dict or a pending
+    (cache key, Future) pair.
+    """
+    pending = []
+    for sentence in sentences:
+        translated, served_by = phrase_lookup.lookup(sentence, source, target)
+        if translated is None:
+            key = _cache_key(sentence, source, target, profile)
+            translated, served_by = _cache.get(key), "cache"
+            if translated is None:
+                pending.append((key, _batcher.submit(sentence, source, target, profile)))
+                continue
+        pending.append(_result(translated, served_by, profile))
+    return pending
+
 
-    # Generate, forcing BOS to the target language id
-    forced_bos_id = _get_lang_id(tgt)
-    output = model.generate(
-        **inputs,
-        forced_bos_token_id=forced_bos_id,
-        max_length=128,
+def _resolve_segment(item, profile: str) -> Dict:
+    if isinstance(item, dict):
+        return item
+    key, future = item
+    translated, tokens = future.result()
+    if _cacheable(profile):
+        _cache.set(key, translated)
+    return _result(translated, "model", profile, tokens)
+
+
+def iter_translate_sentences(sentences: List[str], source: str, target: str,
+                             profile: str = DEFAULT_PROFILE) -> Iterator[Dict]:
+    """
+    Translate pre-split sentences, yielding each result in order as soon as
+    it is ready (the first batch comes back before the whole document).
+    """
+    for index, item in enumerate(_submit_segments(sentences, source, target, profile)):
+        result = _resolve_segment(item, profile)
+        result["index"] = index
+        yield result
+
+
+def translate_sentences(sentences: List[str], source: str, target: str,
+                        profile: str = DEFAULT_PROFILE) -> Dict:
+    """
+    Translate pre-split sentences and reassemble them in order.
+
+    Returns:
+    {
+        "translated_text": str,
+        "served_by": str,        # shared path, or "mixed"
+        "profile": str,
+        "generated_tokens": int, # summed over sentences
+        "segments": [ {"index", "translated_text", "served_by", ...}, ... ]
+    }
+    """
+    segments = list(iter_translate_sentences(sentences, source, target, profile))
+    paths = {s["served_by"] for s in segments}
+
+    result = _result(
+        " ".join(s["translated_text"] for s in segments),
+        paths.pop() if len(paths) == 1 else "mixed",
+        profile,
+        sum(s["generated_tokens"] for s in segments),
     )
+    result["segments"] = segments
+    return result
+
+
+# ============================================================
+# TOKEN STREAMING
+# ============================================================
+
+def iter_translate_tokens(sentences: List[str], source: str, target: str,
+                          profile: str = DEFAULT_PROFILE) -> Iterator[Tuple[str, Dict]]:
+    """
+    Stream a translation as (event, data) pairs:
+        ("token", {"index", "text"})  – decoded text as the model produces it
+        ("done",  {...})              – full text, per-sentence paths and
+                                        time to first token
+    Fast-path and cached sentences are emitted as a single token.
+    """
+    start = time.perf_counter()
+    first_token_ms = None
+    translations, paths = [], []
+
+    for index, sentence in enumerate(sentences):
+        translated, served_by = phrase_lookup.lookup(sentence, source, target)
+        if translated is None:
+            key = _cache_key(sentence, source, target, profile)
+            translated, served_by = _cache.get(key), "cache"
+
+        if translated is not None:
+            pieces = [translated]
+        else:
+            pieces, served_by = stream_translation(sentence, source, target, profile), "model"
 
-    translated = tokenizer.batch_decode(output, skip_special_tokens=True)[0].strip()
+        text = ""
+        for piece in pieces:
+            if first_token_ms is None:
+                first_token_ms = round((time.perf_counter() - start) * 1000, 1)
+            text += piece
+            yield "token", {"index": index, "text": piece}
 
-    # Custom rule: "hi sir" → "नमस्ते सर" (instead of "हाय सर")
-    if source == "en" and target == "hi":
-        if text.strip().lower().startswith("hi sir"):
-            translated = "नमस्ते सर"
-    if source == "en" and target == "hi":
-        if text.strip().lower().startswith("hi mam"):
-            translated = "नमस्ते मैडम"
+        text = text.strip()
+        # Streaming decodes greedily, so only greedy profiles share the cache
+        greedy = GENERATION_PROFILES[profile]["generate"].get("num_beams", 1) == 1
+        if served_by == "model" and greedy and _cacheable(profile):
+            _cache.set(key, text)
+        translations.append(text)
+        paths.append(served_by)
 
-    return translated
+    yield "done", {
+        "translated_text": " ".join(translations),
+        "served_by": paths,
+        "profile": profile,
+        "first_token_ms": first_token_ms,
+        "total_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
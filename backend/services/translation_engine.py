@@ -0,0 +1,432 @@
+# services/translation_engine.py
+"""
+NLLB translation engine.
+
+Stateless model calls: the source language tag is built per call instead of
+being set on the shared tokenizer, so concurrent batches with different
+languages can never see each other's settings.
+
+With TRANSLATE_WORKERS > 1 the model runs as N replicas in a process pool,
+each pinned to its own share of torch intra-op threads, so throughput
+scales across the cores of one box.
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Iterator, List, Tuple
+import math
+import multiprocessing
+import os
+import threading
+
+from utils.config_utils import env_int, env_float, env_str
+from utils.model_loader import LazyModel
+
+# NLLB model (loaded on first use or by the background preloader)
+model_name = "facebook/nllb-200-distilled-600M"
+
+# CPU inference precision, chosen at load time:
+#   fp32 – full precision (default)
+#   int8 – dynamically quantized nn.Linear layers
+#   bf16 – bfloat16 weights, only where the CPU supports it natively
+PRECISIONS = ("fp32", "int8", "bf16")
+PRECISION = env_str("TRANSLATE_PRECISION", "fp32").lower()
+
+# Model replicas (1 = run in the web process) and torch threads per replica
+WORKERS = max(1, env_int("TRANSLATE_WORKERS", 1))
+THREADS_PER_WORKER = env_int("TRANSLATE_THREADS_PER_WORKER", 0) or max(1, (os.cpu_count() or 1) // WORKERS)
+
+# Decoding profiles, selectable per request (part of the cache key).
+# The output budget scales with the input instead of a fixed max_length:
+#   max_new_tokens = min(max_new_tokens_cap, ceil(input_tokens * length_ratio) + length_extra)
+#   fast    – greedy decoding (what the service always did)
+#   quality – beam search
+#   budget  – greedy with a tighter length budget and a wall-clock cap
+GENERATION_PROFILES: Dict[str, Dict] = {
+    "fast": {
+        "generate": {"num_beams": 1},
+        "length_ratio": 1.5, "length_extra": 10, "max_new_tokens_cap": 256,
+    },
+    "quality": {
+        "generate": {"num_beams": 4, "early_stopping": True},
+        "length_ratio": 2.0, "length_extra": 16, "max_new_tokens_cap": 384,
+    },
+    "budget": {
+        "generate": {"num_beams": 1, "max_time": env_float("TRANSLATE_BUDGET_MS", 1000.0) / 1000.0},
+        "length_ratio": 1.2, "length_extra": 4, "max_new_tokens_cap": 128,
+    },
+}
+DEFAULT_PROFILE = env_str("TRANSLATE_PROFILE", "fast")
+
+# Map simple language codes to NLLB language tags
+LANG_MAP = {
+    "en": "eng_Latn",
+    "hi": "hin_Deva",
+    "ta": "tam_Taml",
+    "te": "tel_Telu",
+    "bn": "ben_Beng",
+    "mr": "mar_Deva",
+    "gu": "guj_Gujr",
+    "pa": "pan_Guru",
+}
+
+
+# ============================================================
+# MODEL LOADING
+# ============================================================
+
+def cpu_supports_bf16() -> bool:
+    """True when the CPU has native bfloat16 instructions (AVX512-BF16 / AMX)."""
+    import torch
+
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        pass
+
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            flags = f.read()
+        return "avx512_bf16" in flags or "amx_bf16" in flags
+    except OSError:
+        return False
+
+
+def _apply_precision(model, precision: str):
+    """Convert a freshly loaded fp32 model to the requested precision."""
+    import torch
+
+    if precision == "int8":
+        quantization = getattr(torch, "ao", torch).quantization
+        return quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    if precision == "bf16":
+        if not cpu_supports_bf16():
+            print("[WARN] CPU has no native bf16 support, falling back to fp32")
+            return model
+        return model.to(torch.bfloat16)
+
+    return model
+
+
+def load_nllb(precision: str = PRECISION, threads: int = THREADS_PER_WORKER):
+    """
+    Load the NLLB tokenizer and model in the given precision
+    (heavy imports stay out of module import).
+    """
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown TRANSLATE_PRECISION '{precision}', expected one of {PRECISIONS}")
+
+    torch.set_num_threads(threads)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+    model.eval()
+    model = _apply_precision(model, precision)
+    return tokenizer, model
+
+
+def _warmup_nllb(handles):
+    """Run one tiny translation so the first real request is not the slow one."""
+    tokenizer, model = handles
+    generate_batch(tokenizer, model, ["hello"], "en", "hi")
+
+
+# In-process model (used directly when WORKERS == 1)
+_nllb = LazyModel("nllb", load_nllb, warmup=_warmup_nllb)
+
+
+# ============================================================
+# STATELESS ENCODE / GENERATE
+# ============================================================
+
+def get_lang_id(tokenizer, lang_code: str) -> int:
+    """
+    Get the token id for a language code like 'hin_Deva' without relying on
+    tokenizer.lang_code_to_id (which is missing in older transformers).
+    """
+    # If your tokenizer DOES have lang_code_to_id, use it
+    if hasattr(tokenizer, "lang_code_to_id"):
+        return tokenizer.lang_code_to_id[lang_code]
+
+    # Fallback: convert the language code token to id directly
+    return tokenizer.convert_tokens_to_ids(lang_code)
+
+
+def encode_batch(tokenizer, texts: List[str], source: str) -> Dict:
+    """
+    Tokenize a batch for the given source language without touching
+    `tokenizer.src_lang`: the language tag and EOS are added here, in the
+    same layout the NLLB tokenizer would produce, and rows are right-padded.
+    """
+    import torch
+
+    src_id = get_lang_id(tokenizer, LANG_MAP.get(source, "eng_Latn"))
+    eos_id = tokenizer.eos_token_id
+    pad_id = tokenizer.pad_token_id
+
+    rows = []
+    for ids in tokenizer(texts, add_special_tokens=False)["input_ids"]:
+        if getattr(tokenizer, "legacy_behaviour", False):
+            rows.append(ids + [eos_id, src_id])
+        else:
+            rows.append([src_id] + ids + [eos_id])
+
+    width = max(len(r) for r in rows)
+    input_ids = [r + [pad_id] * (width - len(r)) for r in rows]
+    attention_mask = [[1] * len(r) + [0] * (width - len(r)) for r in rows]
+
+    return {
+        "input_ids": torch.tensor(input_ids, dtype=torch.long),
+        "attention_mask": torch.tensor(attention_mask, dtype=torch.long),
+    }
+
+
+def generation_kwargs(profile: str, input_tokens: int) -> Dict:
+    """`generate` arguments for a profile, with the budget derived from input length."""
+    settings = GENERATION_PROFILES[profile]
+    budget = math.ceil(input_tokens * settings["length_ratio"]) + settings["length_extra"]
+
+    kwargs = dict(settings["generate"])
+    kwargs["max_new_tokens"] = min(settings["max_new_tokens_cap"], budget)
+    return kwargs
+
+
+def generate_batch_with_counts(tokenizer, model, texts: List[str], source: str, target: str,
+                               profile: str = DEFAULT_PROFILE) -> List[Tuple[str, int]]:
+    """
+    Translate several texts sharing one (source, target) pair with a single
+    padded `generate` call.
+    Returns (translation, generated token count) per text.
+    """
+    inputs = encode_batch(tokenizer, texts, source)
+
+    # Generate, forcing BOS to the target language id
+    forced_bos_id = get_lang_id(tokenizer, LANG_MAP.get(target, "hin_Deva"))
+    output = model.generate(
+        **inputs,
+        forced_bos_token_id=forced_bos_id,
+        **generation_kwargs(profile, inputs["input_ids"].shape[1]),
+    )
+
+    special = set(tokenizer.all_special_ids)
+    counts = [sum(1 for t in row if t not in special) for row in output.tolist()]
+    decoded = tokenizer.batch_decode(output, skip_special_tokens=True)
+
+    return [(t.strip(), n) for t, n in zip(decoded, counts)]
+
+
+def generate_batch(tokenizer, model, texts: List[str], source: str, target: str,
+                   profile: str = DEFAULT_PROFILE) -> List[str]:
+    """Like generate_batch_with_counts, returning only the translations."""
+    return [t for t, _ in generate_batch_with_counts(tokenizer, model, texts, source, target, profile)]
+
+
+def generate_multi_target_with_counts(tokenizer, model, text: str, source: str, targets: List[str],
+                                      profile: str = DEFAULT_PROFILE) -> List[Tuple[str, int]]:
+    """
+    Translate one text into several target languages.
+    The encoder runs once; its output is repeated per target and all
+    targets are decoded as one batch, each row starting with its own
+    language token (decoder_start, <tgt_lang>) instead of forced_bos.
+    Returns (translation, generated token count) per target, in order.
+    """
+    import torch
+    from transformers.modeling_outputs import BaseModelOutput
+
+    inputs = encode_batch(tokenizer, [text], source)
+    rows = len(targets)
+
+    with torch.inference_mode():
+        encoded = model.get_encoder()(**inputs)
+
+    encoder_outputs = BaseModelOutput(last_hidden_state=encoded.last_hidden_state.repeat(rows, 1, 1))
+    decoder_start = model.config.decoder_start_token_id
+    decoder_input_ids = torch.tensor(
+        [[decoder_start, get_lang_id(tokenizer, LANG_MAP[t])] for t in targets],
+        dtype=torch.long,
+    )
+
+    output = model.generate(
+        encoder_outputs=encoder_outputs,
+        attention_mask=inputs["attention_mask"].repeat(rows, 1),
+        decoder_input_ids=decoder_input_ids,
+        **generation_kwargs(profile, inputs["input_ids"].shape[1]),
+    )
+
+    special = set(tokenizer.all_special_ids)
+    counts = [sum(1 for t in row if t not in special) for row in output.tolist()]
+    decoded = tokenizer.batch_decode(output, skip_special_tokens=True)
+
+    return [(t.strip(), n) for t, n in zip(decoded, counts)]
+
+
+# ============================================================
+# WORKER POOL (TRANSLATE_WORKERS > 1)
+# ============================================================
+
+def _init_worker(precision: str, threads: int):
+    """Runs once in every worker process: load + warm up its own replica."""
+    global _nllb
+    _nllb = LazyModel("nllb", lambda: load_nllb(precision, threads), warmup=_warmup_nllb)
+    _nllb.get()
+
+
+def _worker_generate(texts: List[str], source: str, target: str,
+                     profile: str = DEFAULT_PROFILE) -> List[Tuple[str, int]]:
+    tokenizer, model = _nllb.get()
+    return generate_batch_with_counts(tokenizer, model, texts, source, target, profile)
+
+
+def _worker_multi_target(text: str, source: str, targets: List[str],
+                         profile: str = DEFAULT_PROFILE) -> List[Tuple[str, int]]:
+    tokenizer, model = _nllb.get()
+    return generate_multi_target_with_counts(tokenizer, model, text, source, targets, profile)
+
+
+def _start_pool() -> ProcessPoolExecutor:
+    """Start the worker processes and wait until every replica is warm."""
+    pool = ProcessPoolExecutor(
+        max_workers=WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(PRECISION, THREADS_PER_WORKER),
+    )
+    warmups = [pool.submit(_worker_generate, ["hello"], "en", "hi") for _ in range(WORKERS)]
+    for f in warmups:
+        f.result()
+    return pool
+
+
+if WORKERS > 1:
+    # In the web process the "nllb" handle is the pool itself,
+    # so /ready reports ready once all replicas are loaded.
+    _pool = LazyModel("nllb", _start_pool)
+
+
+def submit_batch(texts: List[str], source: str, target: str,
+                 profile: str = DEFAULT_PROFILE) -> Future:
+    """
+    Translate a batch on the engine and return a Future with
+    (translation, generated token count) pairs.
+    Runs inline when WORKERS == 1, otherwise on a pool replica.
+    """
+    if WORKERS > 1:
+        return _pool.get().submit(_worker_generate, texts, source, target, profile)
+
+    future = Future()
+    try:
+        tokenizer, model = _nllb.get()
+        future.set_result(generate_batch_with_counts(tokenizer, model, texts, source, target, profile))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def translate_batch(texts: List[str], source: str, target: str,
+                    profile: str = DEFAULT_PROFILE) -> List[Tuple[str, int]]:
+    """Blocking version of submit_batch."""
+    return submit_batch(texts, source, target, profile).result()
+
+
+def translate_multi_target(text: str, source: str, targets: List[str],
+                           profile: str = DEFAULT_PROFILE) -> List[Tuple[str, int]]:
+    """One text into many targets with a single encoder pass (see generate_multi_target_with_counts)."""
+    if WORKERS > 1:
+        return _pool.get().submit(_worker_multi_target, text, source, targets, profile).result()
+
+    tokenizer, model = _nllb.get()
+    return generate_multi_target_with_counts(tokenizer, model, text, source, targets, profile)
+
+
+# ============================================================
+# TOKEN STREAMING
+# ============================================================
+
+def stream_generate(tokenizer, model, text: str, source: str, target: str,
+                    profile: str = DEFAULT_PROFILE) -> Iterator[str]:
+    """
+    Translate one text, yielding decoded text pieces while `generate` is
+    still running (TextIteratorStreamer hooked into the decoding loop).
+    Streamers only support greedy search, so beam profiles decode greedily
+    here while keeping their length budget.
+    """
+    from transformers import TextIteratorStreamer
+
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+    inputs = encode_batch(tokenizer, [text], source)
+    kwargs = generation_kwargs(profile, inputs["input_ids"].shape[1])
+    kwargs["num_beams"] = 1
+    kwargs.pop("early_stopping", None)
+    errors = []
+
+    def run():
+        try:
+            model.generate(
+                **inputs,
+                forced_bos_token_id=get_lang_id(tokenizer, LANG_MAP.get(target, "hin_Deva")),
+                streamer=streamer,
+                **kwargs,
+            )
+        except Exception as e:
+            errors.append(e)
+            streamer.end()
+
+    thread = threading.Thread(target=run, name="translate-stream", daemon=True)
+    thread.start()
+
+    for piece in streamer:
+        if piece:
+            yield piece
+
+    thread.join()
+    if errors:
+        raise errors[0]
+
+
+def _worker_stream(text: str, source: str, target: str, profile: str, pieces) -> None:
+    """Pool task: push streamed pieces onto a manager queue, then None."""
+    try:
+        tokenizer, model = _nllb.get()
+        for piece in stream_generate(tokenizer, model, text, source, target, profile):
+            pieces.put(piece)
+    finally:
+        pieces.put(None)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def _get_manager():
+    """Shared multiprocessing manager for cross-process streaming queues."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = multiprocessing.get_context("spawn").Manager()
+    return _manager
+
+
+def stream_translation(text: str, source: str, target: str,
+                       profile: str = DEFAULT_PROFILE) -> Iterator[str]:
+    """
+    Yield translated text pieces as they are decoded, in-process or from a
+    pool replica when TRANSLATE_WORKERS > 1.
+    """
+    if WORKERS <= 1:
+        tokenizer, model = _nllb.get()
+        yield from stream_generate(tokenizer, model, text, source, target, profile)
+        return
+
+    pieces = _get_manager().Queue()
+    future = _pool.get().submit(_worker_stream, text, source, target, profile, pieces)
+    while True:
+        piece = pieces.get()
+        if piece is None:
+            break
+        yield piece
+
+    # Re-raise any error from the worker
+    future.result()
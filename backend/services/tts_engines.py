@@ -0,0 +1,200 @@
+# services/tts_engines.py
+"""
+TTS engines behind one small interface: `stream(text, language)` yields
+audio bytes as they are produced.
+
+- "gtts":  Google Translate TTS through one pooled requests.Session, with
+           at most TTS_MAX_IN_FLIGHT outbound requests at a time (gTTS
+           2.5.x; other versions fall back to gTTS's own stream())
+- "local": offline stand-in that renders a tone WAV with a simulated
+           per-request latency, for benchmarks and tests without network
+
+Select with TTS_ENGINE.
+"""
+
+from typing import Iterator
+import base64
+import io
+import math
+import re
+import threading
+import time
+import wave
+
+import numpy as np
+
+from utils.config_utils import env_float, env_int, env_str
+
+ENGINE_NAME = env_str("TTS_ENGINE", "gtts")
+
+# Cap on concurrent outbound engine requests (and the HTTP pool size)
+MAX_IN_FLIGHT = env_int("TTS_MAX_IN_FLIGHT", 4)
+
+# Per-request timeout for the gTTS upstream, so a hung request can't hold
+# one of the MAX_IN_FLIGHT slots forever
+TIMEOUT_SECONDS = env_float("TTS_TIMEOUT_SECONDS", 15.0)
+
+# Local engine: latency before the first chunk, and per chunk after that
+LOCAL_LATENCY_MS = env_int("TTS_LOCAL_LATENCY_MS", 150)
+LOCAL_CHUNK_LATENCY_MS = env_int("TTS_LOCAL_CHUNK_LATENCY_MS", 20)
+
+
+class TTSEngine:
+    """Base class: subclasses yield encoded audio chunks from stream()."""
+
+    name = "base"
+    mimetype = "application/octet-stream"
+    suffix = ""
+
+    def stream(self, text: str, language: str) -> Iterator[bytes]:
+        raise NotImplementedError
+
+
+# ============================================================
+# 1. gTTS (POOLED HTTP SESSION + IN-FLIGHT LIMIT)
+# ============================================================
+
+# Audio payload in the batchexecute response (same pattern gTTS uses)
+_GTTS_AUDIO = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+# The pooled path relies on gTTS internals (_prepare_requests() and the
+# response format above), copied from these releases. Any other installed
+# version uses gTTS's own stream() instead.
+GTTS_POOLED_VERSIONS = ("2.5.",)
+
+
+def _gtts_pooled_supported() -> bool:
+    from gtts import __version__ as version
+    from gtts import gTTS
+
+    if version.startswith(GTTS_POOLED_VERSIONS) and hasattr(gTTS, "_prepare_requests"):
+        return True
+    print(f"[WARN] gTTS {version} not verified for pooled requests; using gTTS's own stream()")
+    return False
+
+
+class GTTSEngine(TTSEngine):
+    name = "gtts"
+    mimetype = "audio/mpeg"
+    suffix = ".mp3"
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT, pooled: bool = True,
+                 timeout: float = TIMEOUT_SECONDS):
+        self.timeout = timeout
+        self.pooled = pooled and _gtts_pooled_supported()
+        self._slots = threading.BoundedSemaphore(max(1, max_in_flight))
+        self._session = None
+
+        if self.pooled:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, max_in_flight))
+            self._session.mount("https://", adapter)
+
+    def stream(self, text: str, language: str) -> Iterator[bytes]:
+        from gtts import gTTS
+        from gtts.tts import gTTSError
+
+        tts = gTTS(text=text, lang=language, timeout=self.timeout)
+
+        if not self.pooled:
+            # gTTS opens a new session per part here; still respect the limit,
+            # but only while fetching (not while the caller consumes a chunk)
+            chunks = tts.stream()
+            while True:
+                with self._slots:
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                yield chunk
+
+        import requests
+
+        # One request per text part (gTTS splits long text), sent over the
+        # shared keep-alive session. Session.send() skips the proxy / CA
+        # bundle environment that Session.request() would apply, so merge it in.
+        for prepared in tts._prepare_requests():
+            settings = self._session.merge_environment_settings(prepared.url, {}, None, None, None)
+            with self._slots:
+                try:
+                    response = self._session.send(prepared, timeout=tts.timeout, **settings)
+                except requests.RequestException as e:
+                    raise gTTSError(f"Failed to connect to the gTTS API: {e}", tts=tts) from e
+                if response.status_code != 200:
+                    raise gTTSError(tts=tts, response=response)
+                body = response.text
+
+            for line in body.splitlines():
+                if "jQ1olc" in line:
+                    match = _GTTS_AUDIO.search(line)
+                    if not match:
+                        raise gTTSError(tts=tts, response=response)
+                    yield base64.b64decode(match.group(1).encode("ascii"))
+
+
+# ============================================================
+# 2. LOCAL STAND-IN ENGINE (NO NETWORK)
+# ============================================================
+
+class LocalToneEngine(TTSEngine):
+    """
+    Renders a 16 kHz mono tone WAV, ~60 ms per character, with simulated
+    engine latency. Deterministic for a given input, so it caches like a
+    real engine.
+    """
+
+    name = "local"
+    mimetype = "audio/wav"
+    suffix = ".wav"
+
+    sample_rate = 16000
+    chunk_seconds = 0.5
+
+    def __init__(self, latency_ms: int = LOCAL_LATENCY_MS, chunk_latency_ms: int = LOCAL_CHUNK_LATENCY_MS,
+                 max_in_flight: int = MAX_IN_FLIGHT):
+        self.latency = latency_ms / 1000
+        self.chunk_latency = chunk_latency_ms / 1000
+        self._slots = threading.BoundedSemaphore(max(1, max_in_flight))
+
+    def _render(self, text: str, language: str) -> bytes:
+        seconds = max(0.3, 0.06 * len(text))
+        t = np.arange(int(seconds * self.sample_rate)) / self.sample_rate
+        pitch = 220 + 20 * (sum(map(ord, language)) % 12)
+        samples = 0.2 * np.sin(2 * math.pi * pitch * t)
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.sample_rate)
+            w.writeframes((samples * 32767).astype("<i2").tobytes())
+        return buffer.getvalue()
+
+    def stream(self, text: str, language: str) -> Iterator[bytes]:
+        with self._slots:
+            time.sleep(self.latency)
+            audio = self._render(text, language)
+
+        step = int(self.chunk_seconds * self.sample_rate) * 2
+        for start in range(0, len(audio), step):
+            if start:
+                time.sleep(self.chunk_latency)
+            yield audio[start: start + step]
+
+
+# ============================================================
+# 3. FACTORY
+# ============================================================
+
+ENGINES = {
+    "gtts": GTTSEngine,
+    "local": LocalToneEngine,
+}
+
+
+def get_engine(name: str = ENGINE_NAME, **kwargs) -> TTSEngine:
+    if name not in ENGINES:
+        raise ValueError(f"Unknown TTS engine: {name} (available: {sorted(ENGINES)})")
+    return ENGINES[name](**kwargs)
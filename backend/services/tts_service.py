@@ -1,19 +1,132 @@
 # services/tts_service.py
+"""
+Text-to-speech with a disk cache in front of the configured engine
+(TTS_ENGINE, see tts_engines.py).
+
+Rendered audio is stored under a content-addressed name derived from
+(normalized text, language, engine), so the phrase-bank phrases that are
+requested over and over are synthesized once and then served from disk.
+
+Nothing goes through temp files: on a miss the engine's audio chunks are
+streamed to the caller as they arrive and collected in memory, and the
+complete audio is written to the cache at the end.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+import io
+import json
+
+from utils.cache_utils import DiskLRUCache
+from utils.config_utils import env_int, env_str
+from utils.module2_utils import normalize_text, normalize_list, split_sentences
+from utils.audio_utils import concat_audio
+from services.tts_engines import get_engine
+
+engine = get_engine()
+
+# Engine/voice id, part of the cache key so a different engine never serves stale audio
+ENGINE = engine.name
+MIMETYPE = engine.mimetype
+
+# Rendered audio cache (size-bounded LRU on disk)
+CACHE_DIR = env_str("TTS_CACHE_DIR", "data/cache/tts")
+CACHE_MAX_MB = env_int("TTS_CACHE_MAX_MB", 256)
+
+# Sentence-parallel batch synthesis (the engine still caps outbound requests)
+BATCH_WORKERS = env_int("TTS_BATCH_WORKERS", 4)
+
+_cache = DiskLRUCache(Path(CACHE_DIR), max_bytes=CACHE_MAX_MB * 1024 * 1024, suffix=engine.suffix)
+
+
+def tts_cache_key(text: str, language: str, engine: str = ENGINE) -> str:
+    return json.dumps([normalize_text(text), language, engine], ensure_ascii=False)
+
+
+def _engine_stream(text: str, language: str) -> Iterator[bytes]:
+    """Audio chunks straight from the engine (gTTS yields one per text part)."""
+    yield from engine.stream(text, language)
+
+
+def cached_speech_path(text: str, language: str) -> Optional[Path]:
+    """Path of the cached audio file, or None on a miss."""
+    return _cache.get_path(tts_cache_key(text, language))
+
+
+def stream_speech(text: str, language: str) -> Iterator[bytes]:
+    """
+    Yield audio chunks as the engine produces them.
+    Once the last chunk is out, the full audio is stored in the cache
+    (an aborted stream is not cached).
+    """
+    buffer = io.BytesIO()
+    for chunk in _engine_stream(text, language):
+        buffer.write(chunk)
+        yield chunk
+
+    _cache.set(tts_cache_key(text, language), buffer.getvalue())
+
+
+def text_to_speech_cached(text: str, language: str) -> Tuple[Path, bool]:
+    """
+    Return (path to the audio file, served_from_cache).
+    The file belongs to the cache: serve it, don't delete it.
+    """
+    path = cached_speech_path(text, language)
+    if path is not None:
+        return path, True
+
+    audio = b"".join(_engine_stream(text, language))
+    return _cache.set(tts_cache_key(text, language), audio), False
 
-from gtts import gTTS
-import tempfile
-import os
 
 def text_to_speech(text: str, language: str) -> str:
     """
-    Convert text to speech using gTTS.
-    Returns path to the saved audio file (MP3).
+    Convert text to speech with the configured engine.
+    Returns path to the (cached) audio file (MP3 for gTTS).
     """
+    return str(text_to_speech_cached(text, language)[0])
+
+
+def is_cached(text: str, language: str) -> bool:
+    return tts_cache_key(text, language) in _cache
+
 
-    tts = gTTS(text=text, lang=language)
+def get_cache_stats():
+    """File count, bytes and hit/miss/eviction counters of the audio cache."""
+    return _cache.stats()
 
-    # Save to temporary file
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-    tts.save(tmp.name)
 
-    return tmp.name
+# ============================================================
+# BATCH SYNTHESIS (SENTENCE-PARALLEL)
+# ============================================================
+
+_batch_pool = ThreadPoolExecutor(max_workers=max(1, BATCH_WORKERS), thread_name_prefix="tts-batch")
+
+
+def speech_bytes(text: str, language: str) -> bytes:
+    """Audio for one sentence, from the cache or the engine (then cached)."""
+    path = cached_speech_path(text, language)
+    if path is not None:
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            pass  # evicted in between
+
+    audio = b"".join(_engine_stream(text, language))
+    _cache.set(tts_cache_key(text, language), audio)
+    return audio
+
+
+def synthesize_batch(texts: List[str], language: str, gap_ms: int = 0) -> List[bytes]:
+    """
+    One audio clip per input text. Every sentence of every text is
+    synthesized concurrently on the batch pool, then each text's
+    sentences are concatenated in order in memory.
+    """
+    groups = [[s for s in normalize_list(split_sentences(text)) if s] for text in texts]
+    futures = [[_batch_pool.submit(speech_bytes, s, language) for s in group] for group in groups]
+
+    fmt = engine.suffix.lstrip(".")
+    return [concat_audio([f.result() for f in group], fmt, gap_ms) if group else b"" for group in futures]
@@ -7,16 +7,26 @@ Provides:
 ✔ WAV/MP3 conversion helpers
 ✔ Base64 encode/decode for audio transport
 ✔ Temporary file creation
+✔ In-memory decoding of uploads to 16 kHz mono float32 (no temp files)
+✔ Energy-based VAD: silence trimming and splitting long audio at pauses
+✔ In-memory concatenation of encoded clips (batch TTS)
 
 Used by:
 - stt_service.py
+- stt_jobs.py
 - scoring_service.py
 - tts_service.py
 """
 
+from typing import List
 import tempfile
 import base64
+import io
 import os
+import subprocess
+import wave
+
+import numpy as np
 from pydub import AudioSegment
 
 
@@ -106,6 +116,203 @@ def delete_file(path: str):
         os.remove(path)
 
 
+# ============================================================
+# 6. IN-MEMORY DECODING (ZERO-DISK STT PATH)
+# ============================================================
+
+# Whisper works on 16 kHz mono float32 samples in [-1, 1]
+SAMPLE_RATE = 16000
+
+
+def decode_audio_bytes(data: bytes, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode an uploaded audio file (raw bytes) into a float32 mono array
+    at `sr` Hz, without touching the disk.
+
+    - 16-bit PCM WAV that is already mono at `sr` → parsed directly, no ffmpeg
+    - anything else → ffmpeg over stdin/stdout pipes
+    """
+    if not data:
+        raise ValueError("Empty audio upload")
+
+    samples = _decode_pcm_wav(data, sr)
+    if samples is not None:
+        return samples
+
+    return _decode_with_ffmpeg(data, sr)
+
+
+def _decode_pcm_wav(data: bytes, sr: int):
+    """Fast path for PCM WAV already in the target format, else None."""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+
+    try:
+        with wave.open(io.BytesIO(data), "rb") as w:
+            if w.getnchannels() != 1 or w.getframerate() != sr or w.getsampwidth() != 2:
+                return None
+            frames = w.readframes(w.getnframes())
+    except (wave.Error, EOFError):
+        # e.g. float or WAVE_FORMAT_EXTENSIBLE files → let ffmpeg handle them
+        return None
+
+    return np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def _decode_with_ffmpeg(data: bytes, sr: int) -> np.ndarray:
+    """Pipe the bytes through ffmpeg and read back 16-bit mono PCM."""
+    cmd = [
+        "ffmpeg",
+        "-loglevel", "error",
+        "-threads", "0",
+        "-i", "pipe:0",
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sr),
+        "pipe:1",
+    ]
+    try:
+        out = subprocess.run(cmd, input=data, capture_output=True, check=True).stdout
+    except FileNotFoundError as e:
+        raise RuntimeError("ffmpeg is required to decode non-WAV (or non 16 kHz mono) audio") from e
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore').strip()}") from e
+
+    return np.frombuffer(out, dtype="<i2").astype(np.float32) / 32768.0
+
+
+# ============================================================
+# 7. VOICE ACTIVITY DETECTION + CHUNKING (LONG RECORDINGS)
+# ============================================================
+
+# Whisper decodes 30 s windows; longer audio is split at pauses
+MAX_CHUNK_SECONDS = 30
+
+
+def frame_energies(samples: np.ndarray, sr: int = SAMPLE_RATE, frame_ms: int = 30) -> np.ndarray:
+    """RMS level (dBFS) of consecutive, non-overlapping `frame_ms` frames."""
+    frame = max(1, int(sr * frame_ms / 1000))
+    n = len(samples) // frame
+    if n == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    frames = samples[: n * frame].reshape(n, frame)
+    rms = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+    return 20 * np.log10(rms + 1e-10)
+
+
+def detect_voiced_regions(samples: np.ndarray, sr: int = SAMPLE_RATE, frame_ms: int = 30,
+                          threshold_db: float = None, min_silence_ms: int = 300,
+                          min_speech_ms: int = 120, pad_ms: int = 150):
+    """
+    Energy-based VAD. Returns [(start_sample, end_sample), ...] of speech.
+
+    - threshold: `threshold_db`, or adapted to the clip's noise floor and peak
+    - gaps shorter than `min_silence_ms` are bridged
+    - bursts shorter than `min_speech_ms` (clicks, pops) are dropped
+    - each region is padded by `pad_ms` so word edges aren't clipped
+    """
+    db = frame_energies(samples, sr, frame_ms)
+    if len(db) == 0:
+        return []
+
+    if threshold_db is None:
+        # Noise floor + 10 dB, but never above peak - 20 dB (speech-dominated clips)
+        # and never below -50 dBFS (all-silence clips)
+        floor = float(np.percentile(db, 10)) + 10.0
+        threshold_db = max(-50.0, min(floor, float(db.max()) - 20.0))
+
+    voiced = db > threshold_db
+    if not voiced.any():
+        return []
+
+    # Run boundaries of the voiced mask (in frames)
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    min_gap = max(1, min_silence_ms // frame_ms)
+    merged = [[starts[0], ends[0]]]
+    for start, end in zip(starts[1:], ends[1:]):
+        if start - merged[-1][1] < min_gap:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    frame = int(sr * frame_ms / 1000)
+    pad = int(sr * pad_ms / 1000)
+    min_len = min_speech_ms // frame_ms
+
+    regions = []
+    for start, end in merged:
+        if end - start < min_len:
+            continue
+        a = max(0, int(start) * frame - pad)
+        b = min(len(samples), int(end) * frame + pad)
+        if regions and a <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], b)
+        else:
+            regions.append((a, b))
+    return regions
+
+
+def trim_silence(samples: np.ndarray, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Drop leading and trailing silence (returns an empty array if all silent)."""
+    regions = detect_voiced_regions(samples, sr)
+    if not regions:
+        return samples[:0]
+    return samples[regions[0][0]: regions[-1][1]]
+
+
+def split_on_pauses(samples: np.ndarray, sr: int = SAMPLE_RATE,
+                    max_seconds: float = MAX_CHUNK_SECONDS):
+    """
+    Group voiced regions into chunks of at most `max_seconds`, cutting
+    only at pauses. Silence between chunks (and at both ends) is dropped.
+    A single region longer than the limit is cut into equal pieces.
+
+    Returns [(start_sample, end_sample), ...].
+    """
+    limit = int(max_seconds * sr)
+    chunks = []
+
+    for start, end in detect_voiced_regions(samples, sr):
+        if end - start > limit:
+            pieces = -(-(end - start) // limit)
+            step = -(-(end - start) // pieces)
+            chunks += [(a, min(a + step, end)) for a in range(start, end, step)]
+        elif chunks and end - chunks[-1][0] <= limit:
+            chunks[-1] = (chunks[-1][0], end)
+        else:
+            chunks.append((start, end))
+    return chunks
+
+
+# ============================================================
+# 8. IN-MEMORY CONCATENATION (BATCH TTS)
+# ============================================================
+
+def concat_audio(segments: List[bytes], fmt: str = "mp3", gap_ms: int = 0) -> bytes:
+    """
+    Join encoded audio clips (all in `fmt`) in order, optionally with
+    `gap_ms` of silence between them, and return the encoded result.
+    A single clip is returned as-is (no re-encode).
+    """
+    if len(segments) == 1:
+        return segments[0]
+
+    combined = AudioSegment.empty()
+    for i, data in enumerate(segments):
+        if i and gap_ms:
+            combined += AudioSegment.silent(duration=gap_ms)
+        combined += AudioSegment.from_file(io.BytesIO(data), format=fmt)
+
+    out = io.BytesIO()
+    combined.export(out, format=fmt)
+    return out.getvalue()
+
+
 # ============================================================
 # DEBUG / DEV TESTS (Not used in production)
 # ============================================================
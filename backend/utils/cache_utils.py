@@ -0,0 +1,314 @@
+"""
+Cache Utilities for Voice Translator Backend
+--------------------------------------------
+Provides:
+✔ Thread-safe in-memory LRU cache with hit/miss/eviction counters
+✔ Persistent key/value store on local disk (SQLite, survives restarts)
+✔ Two-tier cache (memory LRU in front of the disk store)
+✔ Size-bounded LRU file cache with atomic writes (binary payloads)
+
+Used by:
+- translate_service.py
+- stt_service.py
+- tts_service.py
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+
+# ============================================================
+# 1. IN-MEMORY LRU CACHE
+# ============================================================
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache.
+    Safe to share between Flask request threads.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max(1, max_entries)
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, default=None):
+        """Return the cached value (and mark it recently used) or default."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: str, value: Any):
+        """Insert/replace a value, evicting the oldest entries when full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: str) -> bool:
+        """Membership test that does not touch the counters or LRU order."""
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "max_size": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# ============================================================
+# 2. PERSISTENT DISK STORE (SQLITE)
+# ============================================================
+
+class SqliteStore:
+    """
+    Minimal persistent key/value store backed by a local SQLite file.
+    Values are stored as JSON text.
+    """
+
+    def __init__(self, path: Path, table: str = "cache"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.table = table
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return default
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)",
+                (key, data),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+# ============================================================
+# 3. TWO-TIER CACHE (MEMORY → DISK)
+# ============================================================
+
+class TwoTierCache:
+    """
+    In-memory LRU in front of an optional persistent store.
+    Disk hits are promoted into memory so hot keys stay fast.
+    """
+
+    def __init__(self, max_entries: int = 1024, store: Optional[SqliteStore] = None):
+        self.memory = LRUCache(max_entries)
+        self.store = store
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str, default=None):
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        if self.store is not None:
+            value = self.store.get(key)
+            if value is not None:
+                self.disk_hits += 1
+                self.memory.set(key, value)
+                return value
+
+        self.misses += 1
+        return default
+
+    def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        if self.store is not None:
+            self.store.set(key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def __contains__(self, key: str) -> bool:
+        if key in self.memory:
+            return True
+        return self.store is not None and self.store.get(key) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        memory = self.memory.stats()
+        lookups = memory["hits"] + self.disk_hits + self.misses
+        return {
+            "memory": memory,
+            "disk": {
+                "enabled": self.store is not None,
+                "path": str(self.store.path) if self.store is not None else None,
+                "size": len(self.store) if self.store is not None else 0,
+                "hits": self.disk_hits,
+            },
+            "hits": memory["hits"] + self.disk_hits,
+            "misses": self.misses,
+            "evictions": memory["evictions"],
+            "hit_rate": round((memory["hits"] + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+# ============================================================
+# 4. SIZE-BOUNDED FILE CACHE (BINARY BLOBS ON DISK)
+# ============================================================
+
+class DiskLRUCache:
+    """
+    Content-addressed file cache for binary payloads (e.g. rendered audio).
+
+    Each key is stored as `<sha256(key)><suffix>` in `directory`. Writes go
+    to a temp file in the same directory and are moved into place with
+    os.replace, so readers never see a partial file. When the directory
+    grows past `max_bytes`, least-recently-used files are deleted.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, suffix: str = ""):
+        self.directory = Path(directory).resolve()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # name -> size, oldest first (mtime is bumped on every hit)
+        files = sorted(self.directory.glob(f"*{suffix}"), key=lambda p: p.stat().st_mtime)
+        self._index: "OrderedDict[str, int]" = OrderedDict((p.name, p.stat().st_size) for p in files)
+        self._bytes = sum(self._index.values())
+
+    def name_for(self, key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest() + self.suffix
+
+    def get_path(self, key: str) -> Optional[Path]:
+        """Path of the cached file (marked recently used) or None."""
+        name = self.name_for(key)
+        path = self.directory / name
+        with self._lock:
+            if name in self._index and path.exists():
+                self._index.move_to_end(name)
+                self.hits += 1
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                return path
+            self._index.pop(name, None)
+            self.misses += 1
+            return None
+
+    def set(self, key: str, data: bytes) -> Path:
+        """Atomically write `data` for `key`; returns the final path."""
+        name = self.name_for(key)
+        path = self.directory / name
+
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        with self._lock:
+            self._bytes += len(data) - self._index.pop(name, 0)
+            self._index[name] = len(data)
+            self._evict(keep=name)
+        return path
+
+    def _evict(self, keep: str):
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            name, size = next(iter(self._index.items()))
+            if name == keep:
+                break
+            del self._index[name]
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                (self.directory / name).unlink()
+            except FileNotFoundError:
+                pass
+
+    def __contains__(self, key: str) -> bool:
+        """Membership test that does not touch the counters or LRU order."""
+        return self.name_for(key) in self._index
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "path": str(self.directory),
+            "files": len(self._index),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# ============================================================
+# DEBUG / DEV TESTS (Not used in production)
+# ============================================================
+
+if __name__ == "__main__":
+    c = LRUCache(2)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")
+    c.set("c", 3)
+    print("LRU keys:", list(c._data.keys()), c.stats())
@@ -0,0 +1,63 @@
+"""
+Config Utilities for Voice Translator Backend
+---------------------------------------------
+Provides:
+✔ Typed environment variable readers (int / float / bool / str)
+
+All tunables (batch sizes, cache sizes, worker counts…) are read from the
+environment once at import time so a deployment can change them without
+code edits.
+
+Used by:
+- translate_service.py
+- translation_engine.py
+- app1.py
+"""
+
+import os
+
+
+# ============================================================
+# 1. ENVIRONMENT READERS
+# ============================================================
+
+def env_str(name: str, default: str = "") -> str:
+    """Read a string setting from the environment."""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip()
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting, falling back to default on bad values."""
+    try:
+        return int(env_str(name, str(default)))
+    except ValueError:
+        print(f"[WARN] Invalid integer for {name}, using {default}")
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting, falling back to default on bad values."""
+    try:
+        return float(env_str(name, str(default)))
+    except ValueError:
+        print(f"[WARN] Invalid number for {name}, using {default}")
+        return default
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    """Read a boolean setting ("1", "true", "yes", "on" are truthy)."""
+    value = env_str(name, "")
+    if not value:
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+# ============================================================
+# DEBUG / DEV TESTS (Not used in production)
+# ============================================================
+
+if __name__ == "__main__":
+    print("TRANSLATE_MAX_BATCH_SIZE =", env_int("TRANSLATE_MAX_BATCH_SIZE", 8))
@@ -0,0 +1,136 @@
+"""
+Model Loader Utilities for Voice Translator Backend
+---------------------------------------------------
+Provides:
+✔ Lazy, thread-safe model handles (load on first use)
+✔ Optional background loading after app startup
+✔ Warmup step (dummy inference) before a model is marked ready
+✔ Registry of model states for the /ready probe
+✔ Unloading, for services that evict idle models under a memory budget
+
+Used by:
+- translation_engine.py
+- stt_service.py
+- app1.py / health_route.py
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+import threading
+import time
+
+
+# ============================================================
+# 1. LAZY MODEL HANDLE
+# ============================================================
+
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+# name -> LazyModel, filled as services create their handles
+MODEL_REGISTRY: Dict[str, "LazyModel"] = {}
+
+
+class LazyModel:
+    """
+    Wraps an expensive loader so the model is only built when first needed.
+
+    `loader()` returns the loaded object (model, tokenizer tuple, …).
+    `warmup(obj)` optionally runs a dummy inference so the first real
+    request doesn't pay one-off allocation/JIT costs.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Any],
+                 warmup: Optional[Callable[[Any], None]] = None):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+
+        self.state = NOT_LOADED
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+
+        self._obj = None
+        self._lock = threading.Lock()
+
+        MODEL_REGISTRY[name] = self
+
+    def get(self):
+        """Return the loaded object, loading (and warming up) on first call."""
+        if self.state == READY:
+            return self._obj
+
+        with self._lock:
+            if self.state != READY:
+                self._load()
+        return self._obj
+
+    def _load(self):
+        self.state = LOADING
+        self.error = None
+        try:
+            start = time.perf_counter()
+            obj = self.loader()
+            self.load_seconds = round(time.perf_counter() - start, 3)
+
+            if self.warmup is not None:
+                start = time.perf_counter()
+                self.warmup(obj)
+                self.warmup_seconds = round(time.perf_counter() - start, 3)
+
+            self._obj = obj
+            self.state = READY
+
+        except Exception as e:
+            self.state = FAILED
+            self.error = str(e)
+            raise
+
+    def unload(self):
+        """Drop the loaded object so its memory can be reclaimed (reloads on next get())."""
+        with self._lock:
+            self._obj = None
+            self.state = NOT_LOADED
+            self.warmup_seconds = None
+
+    def load_in_background(self) -> threading.Thread:
+        """Start loading on a daemon thread (errors are kept in `status()`)."""
+        def run():
+            try:
+                self.get()
+            except Exception as e:
+                print(f"[WARN] Background load of '{self.name}' failed: {e}")
+
+        thread = threading.Thread(target=run, name=f"load-{self.name}", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "error": self.error,
+        }
+
+
+# ============================================================
+# 2. REGISTRY HELPERS
+# ============================================================
+
+def preload_models(names: List[str]):
+    """Kick off background loading for the given registered models."""
+    for name in names:
+        if name in MODEL_REGISTRY:
+            MODEL_REGISTRY[name].load_in_background()
+
+
+def models_status(names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """State of each named model (unknown names report as not_loaded)."""
+    return {
+        name: MODEL_REGISTRY[name].status() if name in MODEL_REGISTRY
+        else {"state": NOT_LOADED, "load_seconds": None, "warmup_seconds": None, "error": None}
+        for name in names
+    }
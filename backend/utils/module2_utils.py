@@ -5,6 +5,7 @@ Provides:
 ✔ Supported language map
 ✔ Phrase bank CSV loader (multilingual)
 ✔ Text normalization utilities
+✔ Script-aware sentence segmentation
 ✔ Phrase filtering & slicing helpers
 ✔ Safe dictionary access
 
@@ -13,6 +14,7 @@ This module is clean, production-ready, and used across the backend.
 
 from pathlib import Path
 import csv
+import re
 from typing import Dict, List, Any
 
 # ============================================================
@@ -33,6 +35,22 @@ LANGUAGES: Dict[str, Dict[str, str]] = {
 }
 
 
+# Language key -> column holding that language in phrase_bank_multilang.csv
+# (native script; "<column>_transliteration" holds the romanized form)
+PHRASE_BANK_COLUMNS: Dict[str, str] = {
+    "en": "english",
+    "hi": "hindi",
+    "ta": "tamil",
+    "te": "telugu",
+    "mr": "marathi",
+    "bn": "bengali",
+    "gu": "gujarati",
+    "kn": "kannada",
+    "ml": "malayalam",
+    "pa": "punjabi",
+}
+
+
 def get_supported_language_keys() -> List[str]:
     """Return alphabetically sorted list of supported language keys."""
     return sorted(list(LANGUAGES.keys()))
@@ -63,6 +81,34 @@ def normalize_list(texts: List[str]) -> List[str]:
     """Normalize a list of strings."""
     return [normalize_text(t) for t in texts if t]
 
+
+# Sentence terminators: ASCII punctuation plus the Devanagari danda (।) and
+# double danda (॥) used across Hindi/Marathi/Bengali text. A boundary needs
+# whitespace (or end of text) after it, so "3.5" or "e.g." mid-word stays intact.
+_SENTENCE_END = re.compile(r"(?<=[.!?।॥])\s+|\n+")
+
+
+def split_sentences(text: str, max_words: int = 60) -> List[str]:
+    """
+    Split text into sentences (punctuation is kept).
+    Sentences longer than `max_words` are cut into word chunks so no single
+    model input gets truncated.
+
+    Example:
+        split_sentences("नमस्ते। आप कैसे हैं? Fine.")
+        → ["नमस्ते।", "आप कैसे हैं?", "Fine."]
+    """
+    if not text:
+        return []
+
+    sentences: List[str] = []
+    for part in _SENTENCE_END.split(text):
+        words = part.split()
+        for i in range(0, len(words), max(1, max_words)):
+            sentences.append(" ".join(words[i:i + max_words]))
+
+    return [s for s in sentences if s]
+
 # ============================================================
 # 3. PHRASE BANK (CSV LOADING)
 # ============================================================
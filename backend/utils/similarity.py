@@ -0,0 +1,284 @@
+"""
+Similarity Utilities for Voice Translator Backend
+-------------------------------------------------
+Provides:
+✔ Character-level Levenshtein distance (bit-parallel, Myers / Hyyrö)
+✔ Reusable compiled reference patterns (compile once, compare many)
+✔ Normalized similarity in [0, 1]
+✔ Word-level alignment with a backtrace (match / substitute / delete / insert)
+✔ Batched distances for many pairs at once (NumPy, one uint64 lane per pair)
+
+The bit-parallel distance processes one attempt character per step with a
+handful of integer operations on bit-vectors as long as the reference.
+Python ints are arbitrary precision, so there is no 64-character limit.
+
+Used by:
+- scoring_service.py
+"""
+
+from typing import Dict, List, NamedTuple, Sequence
+
+import numpy as np
+
+
+# ============================================================
+# 1. BIT-PARALLEL LEVENSHTEIN (MYERS)
+# ============================================================
+
+class Pattern(NamedTuple):
+    """Reference string pre-processed for bit-parallel matching."""
+    text: str
+    length: int
+    peq: Dict[str, int]     # char -> bitmask of its positions in `text`
+
+
+def compile_pattern(text: str) -> Pattern:
+    """Build the per-character position masks for `text` (do this once per reference)."""
+    peq: Dict[str, int] = {}
+    for i, ch in enumerate(text):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    return Pattern(text, len(text), peq)
+
+
+def levenshtein(pattern, text: str) -> int:
+    """
+    Edit distance (insert / delete / substitute, cost 1) between a
+    reference and `text`. `pattern` may be a str or a compiled Pattern.
+    """
+    reference = pattern if isinstance(pattern, str) else pattern.text
+    if reference == text:
+        return 0
+
+    # Shared prefix / suffix never costs anything: drop it before the bit
+    # loop (cheap for learner attempts close to the reference)
+    start = 0
+    limit = min(len(reference), len(text))
+    while start < limit and reference[start] == text[start]:
+        start += 1
+    end = 0
+    while end < limit - start and reference[-1 - end] == text[-1 - end]:
+        end += 1
+    text = text[start:len(text) - end]
+
+    m = len(reference) - start - end
+    if m == 0:
+        return len(text)
+    if not text:
+        return m
+
+    if isinstance(pattern, str):
+        peq = compile_pattern(reference[start:len(reference) - end]).peq
+        shift = 0
+    else:
+        # Reuse the compiled masks: shifting drops the prefix positions and
+        # `mask` below cuts off the suffix ones
+        peq = pattern.peq
+        shift = start
+
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+
+    pv, mv, score = mask, 0, m
+    for ch in text:
+        eq = (peq.get(ch, 0) >> shift) & mask
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & mask
+        mh = pv & xh
+
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+
+        # Row 0 grows by one per column (global distance, not substring search)
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+
+    return score
+
+
+def levenshtein_similarity(reference, text: str) -> float:
+    """1 - distance / longer length, in [0, 1] (1.0 for two empty strings)."""
+    ref_len = reference.length if isinstance(reference, Pattern) else len(reference)
+    longest = max(ref_len, len(text))
+    if longest == 0:
+        return 1.0
+    return 1.0 - levenshtein(reference, text) / longest
+
+
+# ============================================================
+# 2. WORD-LEVEL ALIGNMENT
+# ============================================================
+
+def align_words(reference: str, attempt: str) -> List[Dict]:
+    """
+    Align the words of `attempt` against `reference` (minimum word edits)
+    and return the alignment in reference order:
+
+    [
+        {"op": "match",      "reference": "good",    "attempt": "good"},
+        {"op": "substitute", "reference": "morning", "attempt": "mornin", "similarity": 0.857},
+        {"op": "delete",     "reference": "sir",     "attempt": None},     # word skipped
+        {"op": "insert",     "reference": None,      "attempt": "uh"},     # extra word
+    ]
+    """
+    ref, att = reference.split(), attempt.split()
+
+    # Matching leading / trailing words align trivially; only the middle
+    # needs the DP
+    start = 0
+    limit = min(len(ref), len(att))
+    while start < limit and ref[start] == att[start]:
+        start += 1
+    end = 0
+    while end < limit - start and ref[-1 - end] == att[-1 - end]:
+        end += 1
+
+    head = [{"op": "match", "reference": w, "attempt": w} for w in ref[:start]]
+    tail = [{"op": "match", "reference": w, "attempt": w} for w in ref[len(ref) - end:]]
+    ref, att = ref[start:len(ref) - end], att[start:len(att) - end]
+    n, m = len(ref), len(att)
+
+    # dp[i][j] = (word edits, substitution cost) to turn ref[:i] into att[:j].
+    # A substitution costs 1 - character similarity of the two words, so among
+    # equally short edit scripts shared words line up and near-misses pair
+    # with the word they were meant to be.
+    sub = [[(0, 0.0) if r == a else (1, 1.0 - levenshtein_similarity(r, a)) for a in att] for r in ref]
+
+    dp = [[(0, 0.0)] * (m + 1) for _ in range(n + 1)]
+    for i in range(n + 1):
+        dp[i][0] = (i, 0.0)
+    for j in range(m + 1):
+        dp[0][j] = (j, 0.0)
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            e, c = dp[i - 1][j - 1]
+            de, dc = sub[i - 1][j - 1]
+            up, left = dp[i - 1][j], dp[i][j - 1]
+            dp[i][j] = min((e + de, c + dc), (up[0] + 1, up[1]), (left[0] + 1, left[1]))
+
+    ops = []
+    i, j = n, m
+    while i or j:
+        if i and j:
+            e, c = dp[i - 1][j - 1]
+            de, dc = sub[i - 1][j - 1]
+            if dp[i][j] == (e + de, c + dc):
+                if not de:
+                    ops.append({"op": "match", "reference": ref[i - 1], "attempt": att[j - 1]})
+                else:
+                    ops.append({
+                        "op": "substitute",
+                        "reference": ref[i - 1],
+                        "attempt": att[j - 1],
+                        "similarity": round(1.0 - dc, 3),
+                    })
+                i, j = i - 1, j - 1
+                continue
+        if i and dp[i][j] == (dp[i - 1][j][0] + 1, dp[i - 1][j][1]):
+            ops.append({"op": "delete", "reference": ref[i - 1], "attempt": None})
+            i -= 1
+        else:
+            ops.append({"op": "insert", "reference": None, "attempt": att[j - 1]})
+            j -= 1
+
+    ops.reverse()
+    return head + ops + tail
+
+
+# ============================================================
+# 3. BATCHED DISTANCES (NUMPY)
+# ============================================================
+
+# Widest reference that fits one uint64 lane; longer ones use levenshtein()
+LANE_BITS = 64
+
+
+def levenshtein_batch(references: Sequence[str], attempts: Sequence[str]) -> np.ndarray:
+    """
+    Edit distances for many (reference, attempt) pairs in one pass.
+
+    Every pair with a reference of 1..64 characters gets a uint64 lane and
+    the Myers step runs over all lanes at once per attempt character, so
+    the per-step cost is a few array operations instead of a few Python
+    operations per pair. Other pairs fall back to levenshtein().
+
+    The common "one reference, many attempts" case compiles the reference
+    once (pass the same string object / value repeatedly).
+    """
+    if len(references) != len(attempts):
+        raise ValueError("references and attempts must have the same length")
+
+    n = len(references)
+    distances = np.zeros(n, dtype=np.int64)
+
+    compiled: Dict[str, Pattern] = {}
+    lanes = []
+    for k, (reference, attempt) in enumerate(zip(references, attempts)):
+        if 0 < len(reference) <= LANE_BITS:
+            if reference not in compiled:
+                compiled[reference] = compile_pattern(reference)
+            lanes.append(k)
+        else:
+            distances[k] = levenshtein(reference, attempt)
+
+    if not lanes:
+        return distances
+
+    steps = max(len(attempts[k]) for k in lanes)
+    lengths = np.array([len(references[k]) for k in lanes], dtype=np.uint64)
+    one = np.uint64(1)
+
+    # eq[t, lane] = position mask of attempt char t in that lane's reference
+    eq = np.zeros((steps, len(lanes)), dtype=np.uint64)
+    active = np.zeros((steps, len(lanes)), dtype=bool)
+    for lane, k in enumerate(lanes):
+        peq = compiled[references[k]].peq
+        attempt = attempts[k]
+        eq[:len(attempt), lane] = [peq.get(ch, 0) for ch in attempt]
+        active[:len(attempt), lane] = True
+
+    # (1 << 64) - 1 without overflowing: shift the all-ones word right instead
+    mask = np.uint64(0xFFFFFFFFFFFFFFFF) >> (np.uint64(LANE_BITS) - lengths)
+    last = one << (lengths - one)
+    pv = mask.copy()
+    mv = np.zeros(len(lanes), dtype=np.uint64)
+    score = lengths.astype(np.int64)
+
+    with np.errstate(over="ignore"):
+        for t in range(steps):
+            e, live = eq[t], active[t]
+            xv = e | mv
+            xh = (((e & pv) + pv) ^ pv) | e
+            ph = (mv | ~(xh | pv)) & mask
+            mh = pv & xh
+
+            score += live * (((ph & last) != 0).astype(np.int64) - ((mh & last) != 0))
+
+            ph = ((ph << one) | one) & mask
+            mh = (mh << one) & mask
+            pv = np.where(live, (mh | ~(xv | ph)) & mask, pv)
+            mv = np.where(live, ph & xv, mv)
+
+    distances[lanes] = score
+    return distances
+
+
+def similarity_batch(references: Sequence[str], attempts: Sequence[str]) -> np.ndarray:
+    """levenshtein_similarity() for many pairs: 1 - distance / longer length."""
+    longest = np.array([max(len(r), len(a)) for r, a in zip(references, attempts)], dtype=np.float64)
+    distances = levenshtein_batch(references, attempts)
+    return np.where(longest > 0, 1.0 - distances / np.maximum(longest, 1.0), 1.0)
+
+
+# ============================================================
+# DEBUG / DEV TESTS (Not used in production)
+# ============================================================
+
+if __name__ == "__main__":
+    print(levenshtein("kitten", "sitting"))                     # 3
+    print(round(levenshtein_similarity("hello", "ello"), 2))    # 0.8
+    print(align_words("good morning sir", "good mornin"))
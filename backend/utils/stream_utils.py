@@ -0,0 +1,39 @@
+"""
+Streaming Utilities for Voice Translator Backend
+------------------------------------------------
+Provides:
+✔ Server-Sent Events (SSE) message formatting
+✔ Standard headers for streamed Flask responses
+
+Used by:
+- translate_route.py
+"""
+
+from typing import Any, Dict, Optional
+import json
+
+
+# ============================================================
+# 1. SERVER-SENT EVENTS
+# ============================================================
+
+# Disable proxy buffering (nginx) and caching for event streams
+SSE_HEADERS: Dict[str, str] = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(data: Any, event: Optional[str] = None) -> str:
+    """
+    Format one SSE message. `data` is JSON encoded.
+
+    Example:
+        sse_event({"text": "hi"}, event="chunk")
+        → 'event: chunk\\ndata: {"text": "hi"}\\n\\n'
+    """
+    message = ""
+    if event:
+        message += f"event: {event}\n"
+    message += f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return message
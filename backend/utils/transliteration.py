@@ -0,0 +1,193 @@
+"""
+Transliteration Utilities for Voice Translator Backend
+------------------------------------------------------
+Provides:
+✔ Romanization of the phrase bank's Indic scripts (Devanagari, Bengali,
+  Gurmukhi, Gujarati, Tamil, Telugu, Kannada, Malayalam)
+✔ Folding into a shared, diacritic-free romanized space, so native text,
+  the phrase bank's informal *_transliteration spellings and romanized
+  STT output can be compared directly
+
+Romanization reads each character's Unicode name ("DEVANAGARI LETTER KA",
+"TAMIL VOWEL SIGN II", ...), so one table covers every Brahmic script.
+It is deliberately loose (no retroflex / dental distinction, word-final
+schwa dropped for the North Indian scripts): the goal is a comparison
+key, not a scholarly transliteration.
+
+Used by:
+- scoring_service.py
+"""
+
+from functools import lru_cache
+import re
+import unicodedata
+
+# Scripts whose word-final inherent "a" is silent (नमस्त → namast, not namasta)
+SCHWA_DELETING_SCRIPTS = {"DEVANAGARI", "BENGALI", "GURMUKHI", "GUJARATI"}
+
+# Letter names (lowercased, after "<SCRIPT> LETTER ") that are independent vowels
+VOWELS = {
+    "a": "a", "aa": "aa", "i": "i", "ii": "ii", "u": "u", "uu": "uu",
+    "e": "e", "ee": "e", "ai": "ai", "o": "o", "oo": "o", "au": "au",
+    "short e": "e", "short o": "o", "candra e": "e", "candra o": "o", "candra a": "a",
+    "vocalic r": "ri", "vocalic rr": "ri", "vocalic l": "li", "vocalic ll": "li",
+}
+
+# Consonant stems (name minus the inherent "a") -> informal spelling
+CONSONANTS = {
+    "tt": "t", "tth": "th", "dd": "d", "ddh": "dh",
+    "nn": "n", "nnn": "n", "ss": "sh", "ll": "l", "lll": "zh", "rr": "r",
+    "c": "ch", "ch": "chh", "khanda t": "t",
+}
+
+# Signs that add a nasal / breath after the syllable
+NASAL_SIGNS = ("ANUSVARA", "CANDRABINDU", "TIPPI", "BINDI")
+
+# Consonant + nukta (ਸ਼, ज़, फ़, ...; NFC keeps these decomposed)
+NUKTA = {"s": "sh", "j": "z", "ph": "f", "k": "q"}
+
+
+# ============================================================
+# 1. ROMANIZATION
+# ============================================================
+
+@lru_cache(maxsize=None)
+def _classify(ch: str):
+    """
+    (kind, script, latin) for one character:
+    consonant / chillu / vowel / sign (vowel sign) / virama / nasal /
+    visarga / nukta / skip (length marks, ...) / other.
+    """
+    name = unicodedata.name(ch, "")
+    script, _, rest = name.partition(" ")
+
+    if script not in {"DEVANAGARI", "BENGALI", "GURMUKHI", "GUJARATI",
+                      "TAMIL", "TELUGU", "KANNADA", "MALAYALAM"}:
+        return "other", "", ch
+
+    if rest.startswith("LETTER "):
+        letter = rest[len("LETTER "):].lower()
+        if letter in VOWELS:
+            return "vowel", script, VOWELS[letter]
+        if letter.startswith("chillu "):
+            stem = letter[len("chillu "):]
+            return "chillu", script, CONSONANTS.get(stem, stem)
+        if letter == "khanda ta":
+            return "chillu", script, "t"
+        stem = letter[:-1] if letter.endswith("a") else letter
+        return "consonant", script, CONSONANTS.get(stem, stem)
+
+    if rest.startswith("VOWEL SIGN "):
+        vowel = rest[len("VOWEL SIGN "):].lower()
+        return "sign", script, VOWELS.get(vowel, vowel)
+
+    if rest.endswith("VIRAMA"):
+        return "virama", script, ""
+    if rest.endswith("NUKTA"):
+        return "nukta", script, ""
+    if rest.endswith(NASAL_SIGNS):
+        return "nasal", script, "n"
+    if rest.endswith("VISARGA"):
+        return "visarga", script, "h"
+    if rest.startswith("DIGIT "):
+        return "other", script, str(unicodedata.digit(ch, ""))
+    if "DANDA" in rest:
+        return "other", script, " "
+
+    return "skip", script, ""
+
+
+def romanize(text: str) -> str:
+    """
+    Latin rendering of Indic-script text; Latin and other characters pass
+    through unchanged.
+
+    >>> romanize("नमस्ते")
+    'namaste'
+    """
+    out = []
+    pending = False         # last consonant still carries its inherent "a"
+    pending_script = ""
+    syllables = 0           # in the current word (a lone consonant keeps its "a")
+
+    # Compose split vowel signs (ನ + ೆ + ೂ + ೕ → ನೋ) before reading names
+    for ch in unicodedata.normalize("NFC", text):
+        kind, script, latin = _classify(ch)
+
+        if kind == "consonant":
+            if pending:
+                out.append("a")
+            out.append(latin)
+            pending, pending_script = True, script
+            syllables += 1
+        elif kind == "sign":
+            out.append(latin)
+            pending = False
+        elif kind == "virama":
+            pending = False
+        elif kind == "nukta":
+            if pending and out:
+                out[-1] = NUKTA.get(out[-1], out[-1])
+        elif kind in ("vowel", "chillu", "nasal", "visarga"):
+            if pending:
+                out.append("a")
+            out.append(latin)
+            pending = False
+            syllables += kind == "vowel"
+        elif kind == "other":
+            # Word boundary: drop a silent final schwa
+            if pending and not (pending_script in SCHWA_DELETING_SCRIPTS and syllables > 1):
+                out.append("a")
+            pending = False
+            syllables = 0
+            out.append(latin)
+
+    if pending and not (pending_script in SCHWA_DELETING_SCRIPTS and syllables > 1):
+        out.append("a")
+
+    return "".join(out)
+
+
+# ============================================================
+# 2. SHARED ROMANIZED SPACE
+# ============================================================
+
+# Informal spelling variants folded onto one form (applied in order)
+_FOLDS = [
+    ("ee", "i"), ("oo", "u"),
+    ("w", "v"), ("z", "j"), ("q", "k"), ("f", "ph"),
+]
+_REPEATS = re.compile(r"([a-z])\1+")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def fold(text: str) -> str:
+    """
+    Comparison key for romanized text: lowercase, no diacritics (ṇ → n,
+    ā → a), informal spelling variants merged, doubled letters collapsed
+    (dhanyavaad / dhanyavad → dhanyavad).
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+
+    for src, dst in _FOLDS:
+        text = text.replace(src, dst)
+
+    text = _REPEATS.sub(r"\1", text)
+    return " ".join(_NON_ALNUM.sub(" ", text).split())
+
+
+def to_shared_space(text: str) -> str:
+    """fold(romanize(text)): native script, informal romanization and STT
+    output all land in the same space."""
+    return fold(romanize(text or ""))
+
+
+# ============================================================
+# DEBUG / DEV TESTS (Not used in production)
+# ============================================================
+
+if __name__ == "__main__":
+    for native, informal in [("नमस्ते", "namaste"), ("வணக்கம்", "vaṇakkam"),
+                             ("ਸਤ ਸ੍ਰੀ ਅਕਾਲ", "sat sri akaal"), ("मैं ठीक हूँ", "main theek hoon")]:
+        print(native, "→", romanize(native), "|", to_shared_space(native), "vs", to_shared_space(informal))
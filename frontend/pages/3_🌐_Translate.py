@@ -1,5 +1,6 @@
 import streamlit as st
 import requests
+import json
 
 # ⬅️ Change this if you use ngrok or some other URL
 BACKEND = "http://127.0.0.1:5005"
@@ -23,17 +24,36 @@ if st.button("Translate"):
         st.info("Source and target languages are the same.")
     else:
         try:
-            with st.spinner("Translating..."):
-                r = requests.post(
-                    f"{BACKEND}/translate",
-                    json={"text": text, "source": source, "target": target},
-                    timeout=60,
-                )
-            if r.status_code == 200:
-                data = r.json()
-                translated = data.get("translated_text", "")
-                st.success(translated if translated else "No translated text returned.")
-            else:
-                st.error(f"Backend error {r.status_code}: {r.text}")
+            # Stream tokens from /translate/stream so text appears as it is decoded
+            placeholder = st.empty()
+            translated = ""
+            sentences = {}  # sentence index -> text streamed so far
+            with requests.post(
+                f"{BACKEND}/translate/stream",
+                json={"text": text, "source": source, "target": target},
+                stream=True,
+                timeout=60,
+            ) as r:
+                if r.status_code != 200:
+                    st.error(f"Backend error {r.status_code}: {r.text}")
+                else:
+                    event = None
+                    for line in r.iter_lines(decode_unicode=True):
+                        if line.startswith("event:"):
+                            event = line[len("event:"):].strip()
+                        elif line.startswith("data:"):
+                            data = json.loads(line[len("data:"):])
+                            if event == "token":
+                                # Pieces carry their sentence index; join sentences
+                                # with a space like the final translated_text does
+                                index = data.get("index", 0)
+                                sentences[index] = sentences.get(index, "") + data.get("text", "")
+                                translated = " ".join(sentences[i].strip() for i in sorted(sentences))
+                                placeholder.info(translated)
+                            elif event == "done":
+                                translated = data.get("translated_text", translated)
+                            elif event == "error":
+                                st.error(f"Backend error: {data.get('error')}")
+                    placeholder.success(translated if translated else "No translated text returned.")
         except Exception as e:
             st.error(f"Could not reach backend: {e}")